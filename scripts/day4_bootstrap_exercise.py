@@ -2,16 +2,20 @@
 Day 4 Exercise: Bootstrap confidence intervals for refund rates
 Compare refund rates between Saudi Arabia (SA) and UAE (AE)
 """
-import pandas as pd
 from pathlib import Path
 
-from bootcamp_data.bootstrap import bootstrap_diff_means
+from bootcamp_data.bootstrap import bootstrap_diff_rates
+from bootcamp_data.io import read_parquet
 
 ROOT = Path(__file__).parent.parent
 
 def main():
-    # Load analytics table
-    df = pd.read_parquet(ROOT / "data/processed/analytics_table.parquet")
+    # Load analytics table (only the columns and countries we compare)
+    df = read_parquet(
+        ROOT / "data/processed/analytics_table.parquet",
+        columns=["status_clean", "country"],
+        filters=[("country", "in", ["SA", "AE"])],
+    )
     
     print("=" * 80)
     print("DAY 4 EXERCISE: BOOTSTRAP REFUND RATE COMPARISON")
@@ -21,7 +25,7 @@ def main():
     print("\n1. Creating is_refund flag...")
     d = df.assign(is_refund=df["status_clean"].eq("refund"))
     print(f"   ✓ is_refund created")
-    print(f"   Total refunds: {d['is_refund'].sum()} / {len(d)} ({100*d['is_refund'].mean():.2f}%)")
+    print(f"   Total refunds (SA + AE): {d['is_refund'].sum()} / {len(d)} ({100*d['is_refund'].mean():.2f}%)")
     
     # Step 2: Extract groups for SA and AE
     print("\n2. Extracting country groups...")
@@ -31,9 +35,9 @@ def main():
     print(f"   ✓ SA: n={len(a)}, refund_rate={100*a.mean():.2f}%")
     print(f"   ✓ AE: n={len(b)}, refund_rate={100*b.mean():.2f}%")
     
-    # Step 3: Run bootstrap
+    # Step 3: Run bootstrap (refund rates only need counts: n and refunds)
     print("\n3. Running bootstrap (n_boot=2000)...")
-    res = bootstrap_diff_means(a, b, n_boot=2000, seed=0)
+    res = bootstrap_diff_rates(len(a), int(a.sum()), len(b), int(b.sum()), n_boot=2000, seed=0)
     
     print(f"   ✓ Bootstrap complete")
     print(f"\n   RESULTS (SA - AE):")
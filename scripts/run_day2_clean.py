@@ -8,48 +8,91 @@ Order of operations:
   4. Text normalization + flag creation
   5. Write processed output
 Warning: Don't validate uniqueness before deduplication.
+
+Pass --chunksize N (rows) or --chunk-bytes N to stream orders.csv chunk by
+chunk at a flat memory ceiling instead of loading it whole, and
+--engine pyarrow to parse the CSVs with the multi-threaded Arrow reader.
+Pass --incremental to clean only rows appended to orders.csv since the last
+run (byte offset kept in data/cache) and merge them into orders_clean.parquet,
+keeping the latest record per order_id. Pass --check-sample N on exploratory
+reruns to validate a stratified sample of N cleaned rows instead of every row
+(a failing sample escalates to a full scan).
 """
+import argparse
 import logging
 import sys
 from pathlib import Path
 
+import pandas as pd
+
 from bootcamp_data.config import make_paths
-from bootcamp_data.io import read_orders_csv, read_users_csv, write_parquet
+from bootcamp_data.incremental import load_watermark, save_watermark
+from bootcamp_data.io import (
+    read_orders_csv,
+    read_orders_csv_since,
+    read_users_csv,
+    iter_orders_csv,
+    read_parquet,
+    write_parquet,
+    write_parquet_chunks,
+)
+from bootcamp_data.profiling import TableProfile, write_profile_reports
 from bootcamp_data.transforms import (
     enforce_schema,
-    missingness_report,
     add_missing_flags,
     normalize_text,
     apply_mapping,
+    merge_keep_latest,
 )
-from bootcamp_data.quality import (
-    require_columns,
-    assert_non_empty,
-    assert_in_range,
-)
+from bootcamp_data.quality import RuleSet, require_columns, sampled_check
 
 log = logging.getLogger(__name__)
 
 # Root of the workspace
 ROOT = Path(__file__).parent.parent
 
+ORDERS_COLUMNS = ["order_id", "user_id", "amount", "quantity", "created_at", "status"]
+STATUS_MAPPING = {"paid": "paid", "refund": "refund", "refunded": "refund"}
 
-def main() -> None:
-    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(name)s: %(message)s")
-    p = make_paths(ROOT)
+# Checked in one pass over the cleaned orders; all violations are reported together
+ORDERS_RULES = (
+    RuleSet("orders_clean")
+    .require_columns(ORDERS_COLUMNS)
+    .non_empty()
+    .in_range("amount", lo=0)
+    .in_range("quantity", lo=0)
+)
+USERS_RULES = RuleSet("users").require_columns(["user_id", "country", "signup_date"]).non_empty()
 
-    # 1. Load raw inputs
-    log.info("Loading raw inputs")
-    orders_raw = read_orders_csv(p.raw / "orders.csv")
-    users = read_users_csv(p.raw / "users.csv")
-    log.info("Rows: orders_raw=%s, users=%s", len(orders_raw), len(users))
 
-    # 2. Verify columns + non-empty (fast)
-    log.info("Verifying schema")
-    require_columns(orders_raw, ["order_id", "user_id", "amount", "quantity", "created_at", "status"])
-    require_columns(users, ["user_id", "country", "signup_date"])
-    assert_non_empty(orders_raw, "orders_raw")
-    assert_non_empty(users, "users")
+def clean_orders_frame(orders: pd.DataFrame) -> pd.DataFrame:
+    """Steps 5-6 on an already schema-enforced frame (whole file or one chunk)."""
+    # 5. Text normalization + controlled mapping
+    status_norm = normalize_text(orders["status"], categorical=True)
+    status_clean = apply_mapping(status_norm, STATUS_MAPPING, categorical=True)
+
+    # 6. Add missing flags and create clean version
+    orders_clean = (
+        orders
+        .assign(status_clean=status_clean)
+        .pipe(add_missing_flags, cols=["amount", "quantity"])
+    )
+    return orders_clean
+
+
+def write_missingness(profile: TableProfile) -> None:
+    csv_path, md_path = write_profile_reports(profile, ROOT / "reports", "orders")
+    log.info("Wrote missingness report: %s, %s", csv_path, md_path)
+
+
+def run_in_memory(p, engine: str, check_sample: int | None = None) -> None:
+    # 1. Load raw orders
+    log.info("Loading raw orders (engine=%s)", engine)
+    orders_raw = read_orders_csv(p.raw / "orders.csv", engine=engine)
+    log.info("Rows: orders_raw=%s", len(orders_raw))
+
+    # 2. Verify columns (fast, metadata only)
+    require_columns(orders_raw, ORDERS_COLUMNS)
 
     # 3. Enforce schema (types)
     log.info("Enforcing schema")
@@ -57,35 +100,117 @@ def main() -> None:
 
     # 4. Missingness report (do this early — before you "fix" missing values)
     log.info("Generating missingness report")
-    rep = missingness_report(orders)
-    reports_dir = ROOT / "reports"
-    reports_dir.mkdir(parents=True, exist_ok=True)
-    rep_path = reports_dir / "missingness_orders.csv"
-    rep.to_csv(rep_path, index=True)
-    log.info("Wrote missingness report: %s", rep_path)
+    write_missingness(TableProfile().update(orders))
 
-    # 5. Text normalization + controlled mapping
-    log.info("Normalizing status values")
-    status_norm = normalize_text(orders["status"])
-    mapping = {"paid": "paid", "refund": "refund", "refunded": "refund"}
-    status_clean = apply_mapping(status_norm, mapping)
+    # 5-6. Normalize, flag
+    log.info("Normalizing status values, adding missing flags")
+    orders_clean = clean_orders_frame(orders)
 
-    # 6. Add missing flags and create clean version
-    log.info("Adding missing flags")
-    orders_clean = (
-        orders
-        .assign(status_clean=status_clean)
-        .pipe(add_missing_flags, cols=["amount", "quantity"])
+    # 7. Validate non-empty + non-negative amounts and quantities in one pass
+    log.info("Validating orders")
+    if check_sample:
+        # Exploratory reruns: a stratified sample, full scan only if it fails
+        log.info("%s", sampled_check(
+            orders_clean,
+            lambda d: ORDERS_RULES.validate(d).raise_if_failed(),
+            n=check_sample,
+            by="status_clean",
+            name="orders_clean",
+        ))
+    else:
+        ORDERS_RULES.validate(orders_clean).raise_if_failed()
+
+    # 8. Write processed output
+    write_parquet(orders_clean, p.processed / "orders_clean.parquet")
+
+
+def run_streaming(p, chunksize: int | None, chunk_bytes: int | None) -> None:
+    profile = TableProfile()
+    checks = ORDERS_RULES.stream()
+
+    def cleaned_chunks():
+        for i, chunk in enumerate(
+            iter_orders_csv(p.raw / "orders.csv", chunksize=chunksize, chunk_bytes=chunk_bytes)
+        ):
+            if i == 0:
+                require_columns(chunk, ORDERS_COLUMNS)
+            orders = enforce_schema(chunk)
+            profile.update(orders)
+            log.info("Cleaning chunk %s (%s rows)", i, len(orders))
+            orders_clean = clean_orders_frame(orders)
+            checks.update(orders_clean)
+            yield orders_clean
+
+    log.info("Streaming raw orders (chunksize=%s, chunk_bytes=%s)", chunksize, chunk_bytes)
+    write_parquet_chunks(cleaned_chunks(), p.processed / "orders_clean.parquet")
+    checks.report().raise_if_failed()
+
+    # Same report as the in-memory run, accumulated chunk by chunk
+    log.info("Generating missingness report")
+    write_missingness(profile)
+
+
+def run_incremental(p) -> None:
+    src = p.raw / "orders.csv"
+    out = p.processed / "orders_clean.parquet"
+    state = p.cache / "orders_clean.watermark.json"
+
+    wm = load_watermark(state, src)
+    if wm is None or not out.exists():
+        log.info("No valid watermark; cleaning %s from the start", src)
+        offset, prior = 0, None
+    else:
+        log.info("Resuming %s from byte offset %s", src, wm.offset)
+        offset, prior = wm.offset, read_parquet(out)
+
+    delta_raw, end = read_orders_csv_since(src, offset)
+    require_columns(delta_raw, ORDERS_COLUMNS)
+    log.info("New rows: %s", len(delta_raw))
+    if len(delta_raw) == 0:
+        save_watermark(state, src, end)
+        log.info("orders_clean.parquet is up to date")
+        return
+
+    delta = clean_orders_frame(enforce_schema(delta_raw))
+    ORDERS_RULES.validate(delta).raise_if_failed()
+    # Initial build (prior None) dedupes delta too, so the output always equals
+    # dedupe_keep_latest over every row read so far
+    orders_clean = merge_keep_latest(prior, delta, ["order_id"], "created_at")
+    log.info("Rows: orders_clean=%s", len(orders_clean))
+
+    write_missingness(TableProfile().update(orders_clean[ORDERS_COLUMNS]))
+    write_parquet(orders_clean, out)
+    save_watermark(state, src, end)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--chunksize", type=int, default=None, help="stream orders in chunks of N rows")
+    parser.add_argument("--chunk-bytes", type=int, default=None, help="stream orders in chunks of ~N bytes")
+    parser.add_argument("--incremental", action="store_true", help="clean only rows appended since the last run")
+    parser.add_argument("--engine", choices=["pandas", "pyarrow"], default="pandas", help="CSV parser")
+    parser.add_argument(
+        "--check-sample", type=int, default=None, help="validate a sample of N rows (full scan only on failure)"
     )
+    args = parser.parse_args()
+    if args.check_sample is not None and (args.incremental or args.chunksize or args.chunk_bytes):
+        parser.error("--check-sample only applies to the in-memory run (no --chunksize/--chunk-bytes/--incremental)")
+
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(name)s: %(message)s")
+    p = make_paths(ROOT)
+
+    log.info("Loading users")
+    users = read_users_csv(p.raw / "users.csv", engine=args.engine)
+    USERS_RULES.validate(users).raise_if_failed()
 
-    # 7. Validate amounts and quantities are non-negative (fail fast)
-    log.info("Validating ranges")
-    assert_in_range(orders_clean["amount"], lo=0, name="amount")
-    assert_in_range(orders_clean["quantity"], lo=0, name="quantity")
+    if args.incremental:
+        run_incremental(p)
+    elif args.chunksize or args.chunk_bytes:
+        run_streaming(p, args.chunksize, args.chunk_bytes)
+    else:
+        run_in_memory(p, args.engine, args.check_sample)
 
-    # 8. Write processed outputs
     log.info("Writing processed outputs")
-    write_parquet(orders_clean, p.processed / "orders_clean.parquet")
     write_parquet(users, p.processed / "users.parquet")
     log.info("Wrote processed outputs to: %s", p.processed)
     log.info("SUCCESS: End-to-end cleaning pipeline complete")
@@ -2,63 +2,165 @@
 Day 3: Build Analytics Table
 Loads cleaned orders and users, applies datetime and outlier transformations,
 joins tables, and generates comprehensive analytics table.
+Stage results are cached in data/cache and reused while their inputs and code
+are unchanged. With --chunksize, orders are streamed from parquet in chunks,
+joined against the broadcast users table and written straight to the outputs,
+so the order table does not have to fit in memory.
 """
+import argparse
 import logging
 from pathlib import Path
 
+import pandas as pd
+import pyarrow.parquet as pq
+
+from bootcamp_data.cache import StageCache
 from bootcamp_data.config import make_paths
-from bootcamp_data.io import read_parquet, write_parquet
+from bootcamp_data.io import (
+    iter_parquet,
+    read_parquet,
+    write_parquet,
+    write_parquet_chunks,
+    write_parquet_partitioned,
+)
 from bootcamp_data.transforms import (
     parse_datetime,
     add_time_parts,
-    add_outlier_flag,
-    iqr_bounds,
+    outlier_bounds,
+    apply_outlier_bounds,
+)
+from bootcamp_data.joins import DimensionIndex, join_chunks, safe_left_join
+from bootcamp_data.quality import (
+    assert_non_empty,
+    assert_parquet_in_range,
+    assert_parquet_no_nulls,
+    assert_parquet_non_empty,
 )
-from bootcamp_data.joins import safe_left_join
-from bootcamp_data.quality import assert_non_empty
+from bootcamp_data.sketches import sketch_outlier_bounds, sketch_parquet
 
 log = logging.getLogger(__name__)
 
 ROOT = Path(__file__).parent.parent
 
+# Columns the summary reports need (all a streaming run reads back)
+SUMMARY_COLUMNS = ["order_id", "user_id", "amount", "amount__is_outlier", "country"]
 
-def main() -> None:
-    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(name)s: %(message)s")
-    p = make_paths(ROOT)
+
+def check_inputs(p) -> None:
+    """Validate the processed inputs from parquet footer statistics (no full scan)."""
+    orders_path = p.processed / "orders_clean.parquet"
+    users_path = p.processed / "users.parquet"
+    assert_parquet_non_empty(orders_path, "orders_clean")
+    # user_id may be null (left-joined, counted as null_users in the summary)
+    assert_parquet_no_nulls(orders_path, ["order_id"])
+    assert_parquet_in_range(orders_path, "amount", lo=0)
+    assert_parquet_in_range(orders_path, "quantity", lo=0)
+    assert_parquet_non_empty(users_path, "users")
+    assert_parquet_no_nulls(users_path, ["user_id"])
+
+
+def flag_outliers(orders: pd.DataFrame) -> pd.DataFrame:
+    """Step 4: IQR outlier flags for amount (bounds computed on the whole table)."""
+    bounds = outlier_bounds(orders, ["amount"], k=1.5)
+    log.info("Amount outlier bounds: [%.2f, %.2f]", *bounds.loc["amount", ["iqr_lo", "iqr_hi"]])
+    return apply_outlier_bounds(orders, bounds, winsor=False)
+
+
+def run_in_memory(p) -> None:
+    cache = StageCache(p.cache)
+    orders_path = p.processed / "orders_clean.parquet"
+    users_path = p.processed / "users.parquet"
+
+    # Steps 1-5 are chained lazily: each stage is keyed from its inputs'
+    # keys, and only the join result is read back when everything is cached
+    # (a stage is read or run only when a later one misses)
 
     # 1. Load processed data
     log.info("Loading processed data")
-    orders = read_parquet(p.processed / "orders_clean.parquet")
-    users = read_parquet(p.processed / "users.parquet")
-    log.info("Rows: orders=%s, users=%s", len(orders), len(users))
+    log.info(
+        "Rows: orders=%s, users=%s",
+        pq.ParquetFile(orders_path).metadata.num_rows,
+        pq.ParquetFile(users_path).metadata.num_rows,
+    )
+    orders = cache.load(read_parquet, orders_path, lazy=True)
+    users = cache.load(read_parquet, users_path, lazy=True)
 
     # 2. Parse datetime columns
-    log.info("Parsing datetime columns")
-    orders = parse_datetime(orders, "created_at", utc=True)
-    users = parse_datetime(users, "signup_date", utc=True)
+    orders = cache.run(parse_datetime, orders, "created_at", utc=True, lazy=True)
+    users = cache.run(parse_datetime, users, "signup_date", utc=True, lazy=True)
 
     # 3. Add time parts to orders
-    log.info("Extracting time features from created_at")
-    orders = add_time_parts(orders, "created_at")
+    orders = cache.run(
+        add_time_parts, orders, "created_at", compact=True, labels=("month", "dow"), lazy=True
+    )
 
     # 4. Add outlier flags for amount
-    log.info("Computing outlier bounds for amount")
-    lo, hi = iqr_bounds(orders["amount"], k=1.5)
-    log.info("Amount outlier bounds: [%.2f, %.2f]", lo, hi)
-    orders = add_outlier_flag(orders, "amount", k=1.5)
+    orders = cache.run(flag_outliers, orders, lazy=True)
 
     # 5. Join orders with users
-    log.info("Joining orders with users")
-    analytics = safe_left_join(
+    log.info("Building analytics table (parse, time parts, outliers, join)")
+    analytics = cache.run(
+        safe_left_join,
         orders,
         users,
         on="user_id",
         how="left",
         validate="m:1",
-    )
+        lazy=True,
+    ).result()
     assert_non_empty(analytics, "analytics table")
 
-    # 6. Create summary statistics
+    # 6. Write analytics table
+    log.info("Writing analytics table")
+    write_parquet(analytics, p.processed / "analytics_table.parquet")
+    log.info("Wrote analytics table: %s", p.processed / "analytics_table.parquet")
+
+    # Same table laid out by year/month so monthly reads touch one partition
+    write_parquet_partitioned(analytics, p.processed / "analytics_table", overwrite=True)
+    log.info("Wrote partitioned analytics table: %s", p.processed / "analytics_table")
+
+    summarize(analytics, list(analytics.columns))
+
+
+def enrich_orders(orders: pd.DataFrame, bounds: pd.DataFrame) -> pd.DataFrame:
+    """Steps 2-4 on one chunk of orders, with precomputed outlier bounds."""
+    orders = parse_datetime(orders, "created_at", utc=True)
+    orders = add_time_parts(orders, "created_at", compact=True, labels=("month", "dow"))
+    return apply_outlier_bounds(orders, bounds, winsor=False)
+
+
+def run_streaming(p, chunksize: int) -> None:
+    src = p.processed / "orders_clean.parquet"
+    out = p.processed / "analytics_table.parquet"
+    part_root = p.processed / "analytics_table"
+
+    # 1. Broadcast side: users fit in memory and are indexed once
+    users = parse_datetime(read_parquet(p.processed / "users.parquet"), "signup_date", utc=True)
+    users = DimensionIndex(users, "user_id")
+    log.info("Rows: orders=%s, users=%s", pq.ParquetFile(src).metadata.num_rows, len(users))
+
+    # 2. Outlier bounds from a mergeable sketch (one pass over the amount column)
+    bounds = sketch_outlier_bounds({"amount": sketch_parquet(src, "amount")}, k=1.5)
+    log.info("Amount outlier bounds: [%.2f, %.2f]", *bounds.loc["amount", ["iqr_lo", "iqr_hi"]])
+
+    # 3. Enrich + join chunk by chunk, straight into the analytics table
+    log.info("Streaming orders in chunks of %s rows", chunksize)
+    chunks = (enrich_orders(c, bounds) for c in iter_parquet(src, batch_size=chunksize))
+    n_rows = write_parquet_chunks(join_chunks(chunks, users, on="user_id"), out)
+    log.info("Wrote analytics table: %s (%s rows)", out, n_rows)
+
+    # 4. Partitioned copy, re-streamed from the single file
+    write_parquet_partitioned(iter_parquet(out, batch_size=chunksize), part_root, overwrite=True)
+    log.info("Wrote partitioned analytics table: %s", part_root)
+
+    summarize(read_parquet(out, columns=SUMMARY_COLUMNS), pq.read_schema(out).names)
+
+
+def summarize(analytics: pd.DataFrame, columns: list[str]) -> None:
+    """Steps 7-9: summary statistics, revenue by country and schema log."""
+    assert_non_empty(analytics, "analytics table")
+
+    # 7. Create summary statistics
     log.info("Computing summary statistics")
     summary = {
         "total_orders": len(analytics),
@@ -79,11 +181,6 @@ def main() -> None:
         else:
             log.info("  %s: %s", key, val)
 
-    # 7. Write analytics table
-    log.info("Writing analytics table")
-    write_parquet(analytics, p.processed / "analytics_table.parquet")
-    log.info("Wrote analytics table: %s", p.processed / "analytics_table.parquet")
-
     # 8. Build revenue by country summary
     log.info("Building revenue by country summary")
     revenue_summary = (
@@ -110,10 +207,27 @@ def main() -> None:
 
     # 9. Display column info
     log.info("Analytics table schema:")
-    log.info("  Columns: %s", list(analytics.columns))
-    log.info("  Shape: %s rows x %s columns", len(analytics), len(analytics.columns))
+    log.info("  Columns: %s", columns)
+    log.info("  Shape: %s rows x %s columns", len(analytics), len(columns))
     log.info("SUCCESS: Day 3 analytics pipeline complete")
 
 
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--chunksize", type=int, default=None, help="stream orders in chunks of N rows")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(name)s: %(message)s")
+    p = make_paths(ROOT)
+
+    log.info("Checking processed inputs")
+    check_inputs(p)
+
+    if args.chunksize:
+        run_streaming(p, args.chunksize)
+    else:
+        run_in_memory(p)
+
+
 if __name__ == "__main__":
     main()
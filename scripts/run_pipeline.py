@@ -0,0 +1,149 @@
+"""
+Full pipeline as a DAG: raw CSVs -> orders_clean/users parquet -> analytics table + reports
+Same steps as run_day2_clean.py followed by run_day3_build_analytics.py, declared
+as stages with their inputs and outputs. Independent stages (users vs orders,
+missingness report vs normalization) run concurrently, and stages whose inputs
+and code are unchanged since the last run are skipped (state in data/cache).
+"""
+import argparse
+import logging
+from pathlib import Path
+
+import pandas as pd
+
+from bootcamp_data.cache import StageCache
+from bootcamp_data.config import make_paths
+from bootcamp_data.io import read_orders_csv, read_users_csv, write_parquet, write_parquet_partitioned
+from bootcamp_data.joins import safe_left_join
+from bootcamp_data.pipeline import Pipeline, Stage
+from bootcamp_data.profiling import TableProfile, write_profile_reports
+from bootcamp_data.quality import require_columns
+from bootcamp_data.transforms import enforce_schema, parse_datetime, add_time_parts
+
+from run_day2_clean import ORDERS_COLUMNS, ORDERS_RULES, USERS_RULES, clean_orders_frame
+from run_day3_build_analytics import flag_outliers, summarize
+
+log = logging.getLogger(__name__)
+
+ROOT = Path(__file__).parent.parent
+
+
+def enforce_orders(orders_raw: pd.DataFrame) -> pd.DataFrame:
+    require_columns(orders_raw, ORDERS_COLUMNS)
+    return enforce_schema(orders_raw)
+
+
+def report_missingness(orders: pd.DataFrame, reports_dir: Path) -> None:
+    write_profile_reports(TableProfile().update(orders), reports_dir, "orders")
+
+
+def validate_orders(orders_clean: pd.DataFrame) -> None:
+    ORDERS_RULES.validate(orders_clean).raise_if_failed()
+
+
+def validate_users(users: pd.DataFrame) -> None:
+    USERS_RULES.validate(users).raise_if_failed()
+
+
+def write_analytics(analytics: pd.DataFrame, path: Path, partitioned: Path) -> None:
+    write_parquet(analytics, path)
+    write_parquet_partitioned(analytics, partitioned, overwrite=True)
+
+
+def summarize_analytics(analytics: pd.DataFrame) -> None:
+    summarize(analytics, list(analytics.columns))
+
+
+def build_stages(p) -> list[Stage]:
+    orders_clean_path = p.processed / "orders_clean.parquet"
+    users_path = p.processed / "users.parquet"
+    analytics_path = p.processed / "analytics_table.parquet"
+    partitioned_path = p.processed / "analytics_table"
+    reports = ROOT / "reports"
+    return [
+        # Day 2: clean
+        Stage("load_orders", read_orders_csv, inputs=(p.raw / "orders.csv",)),
+        Stage("load_users", read_users_csv, inputs=(p.raw / "users.csv",)),
+        Stage("validate_users", validate_users, inputs=("load_users",)),
+        Stage("enforce_schema", enforce_orders, inputs=("load_orders",)),
+        Stage(
+            "missingness",
+            report_missingness,
+            inputs=("enforce_schema",),
+            kwargs={"reports_dir": reports},
+            outputs=(reports / "missingness_orders.csv", reports / "missingness_orders.md"),
+        ),
+        Stage("normalize", clean_orders_frame, inputs=("enforce_schema",)),
+        Stage("validate_orders", validate_orders, inputs=("normalize",)),
+        Stage(
+            "write_orders",
+            write_parquet,
+            inputs=("normalize",),
+            kwargs={"path": orders_clean_path},
+            outputs=(orders_clean_path,),
+            after=("validate_orders",),
+        ),
+        Stage(
+            "write_users",
+            write_parquet,
+            inputs=("load_users",),
+            kwargs={"path": users_path},
+            outputs=(users_path,),
+            after=("validate_users",),
+        ),
+        # Day 3: analytics
+        Stage("parse_orders", parse_datetime, inputs=("normalize",), kwargs={"col": "created_at", "utc": True},
+              after=("validate_orders",)),
+        Stage("parse_users", parse_datetime, inputs=("load_users",), kwargs={"col": "signup_date", "utc": True},
+              after=("validate_users",)),
+        Stage(
+            "time_parts",
+            add_time_parts,
+            inputs=("parse_orders",),
+            kwargs={"ts_col": "created_at", "compact": True, "labels": ("month", "dow")},
+        ),
+        Stage("outliers", flag_outliers, inputs=("time_parts",)),
+        Stage(
+            "join",
+            safe_left_join,
+            inputs=("outliers", "parse_users"),
+            kwargs={"on": "user_id", "how": "left", "validate": "m:1"},
+        ),
+        Stage(
+            "write_analytics",
+            write_analytics,
+            inputs=("join",),
+            kwargs={"path": analytics_path, "partitioned": partitioned_path},
+            outputs=(analytics_path, partitioned_path),
+        ),
+        Stage(
+            "summarize",
+            summarize_analytics,
+            inputs=("join",),
+            outputs=(reports / "revenue_by_country.csv",),
+        ),
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("targets", nargs="*", help="stages to bring up to date (default: all)")
+    parser.add_argument("--workers", type=int, default=4, help="stages run at the same time")
+    parser.add_argument("--executor", choices=["thread", "process"], default="thread", help="worker pool")
+    parser.add_argument("--force", action="store_true", help="re-run every stage")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(name)s: %(message)s")
+    p = make_paths(ROOT)
+
+    pipeline = Pipeline(build_stages(p), StageCache(p.cache))
+    status = pipeline.run(
+        args.targets or None, max_workers=args.workers, executor=args.executor, force=args.force
+    )
+    n_ran = sum(s == "ran" for s in status.values())
+    log.info("Stages run: %s, skipped: %s", n_ran, len(status) - n_ran)
+    log.info("SUCCESS: Pipeline complete")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+Test dedupe_keep_latest edge cases (missing timestamps, ties, multi-column keys)
+and dedupe_keep_latest_chunks against a single pass
+"""
+
+from pathlib import Path
+import sys
+import warnings
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from bootcamp_data.transforms import dedupe_keep_latest, dedupe_keep_latest_chunks
+
+
+def reference_keep_latest(df, key_cols, ts_col):
+    """Slow reference: per key, the last row holding the latest timestamp (NaT oldest)"""
+    keep = []
+    for _, group in df.groupby(key_cols, sort=False, dropna=False):
+        ts = group[ts_col]
+        latest = group[ts == ts.max()] if ts.notna().any() else group
+        keep.append(latest.index[-1])
+    return df.loc[sorted(keep)].reset_index(drop=True)
+
+
+def random_orders(n, seed=0):
+    rng = np.random.default_rng(seed)
+    ts = pd.Series(pd.to_datetime("2025-01-01", utc=True) + pd.to_timedelta(rng.integers(0, 20, n), unit="D"))
+    ts[rng.random(n) < 0.1] = pd.NaT
+    user = pd.Series(rng.choice(["u1", "u2", "u3"], n), dtype="string")
+    user[rng.random(n) < 0.05] = pd.NA
+    return pd.DataFrame({
+        "order_id": pd.Series(rng.choice([f"A{i}" for i in range(40)], n), dtype="string"),
+        "user_id": user,
+        "created_at": ts,
+        "status": pd.Categorical(rng.choice(["paid", "refund"], n)),
+        "row": np.arange(n),
+    })
+
+
+def main():
+    """Test dedupe_keep_latest and dedupe_keep_latest_chunks"""
+
+    print("=" * 60)
+    print("KEEP-LATEST DEDUPLICATION TEST")
+    print("=" * 60)
+
+    # Step 1: Missing timestamps rank oldest
+    print("\n1. Missing timestamps...")
+    df = pd.DataFrame({
+        "order_id": ["A1", "A1", "A2", "A2"],
+        "created_at": pd.to_datetime(["2025-01-02", None, None, None]),
+        "row": [0, 1, 2, 3],
+    })
+    out = dedupe_keep_latest(df, ["order_id"], "created_at")
+    assert out["row"].tolist() == [0, 3], out
+    print("   ✓ A dated record beats a later undated one; all-NaT keys keep the last row")
+
+    # Step 2: Ties go to the last row
+    print("\n2. Tied timestamps...")
+    df = pd.DataFrame({
+        "order_id": ["A1", "A1", "A1"],
+        "created_at": ["2025-01-02", "2025-01-02", "2025-01-01"],
+        "row": [0, 1, 2],
+    })
+    out = dedupe_keep_latest(df, ["order_id"], "created_at")
+    assert out["row"].tolist() == [1], out
+    print("   ✓ Last of the tied latest rows is kept (string timestamps)")
+
+    # Step 3: Multi-column keys, including missing key values
+    print("\n3. Multi-column keys...")
+    df = pd.DataFrame({
+        "order_id": pd.Series(["A1", "A1", "A1", "A1", "A1"], dtype="string"),
+        "user_id": pd.Series(["u1", "u2", None, "u1", None], dtype="string"),
+        "created_at": pd.to_datetime(["2025-01-01", "2025-01-01", "2025-01-01", "2025-01-03", "2025-01-02"]),
+        "row": [0, 1, 2, 3, 4],
+    })
+    out = dedupe_keep_latest(df, ["order_id", "user_id"], "created_at")
+    assert out["row"].tolist() == [1, 3, 4], out
+    print("   ✓ (order_id, user_id) pairs deduplicated separately, NA is its own key")
+    cat = df.assign(user_id=df["user_id"].astype(pd.CategoricalDtype(["u1", "u2", "u9"])))
+    with warnings.catch_warnings():
+        warnings.simplefilter("error", FutureWarning)
+        out = dedupe_keep_latest(cat, ["order_id", "user_id"], "created_at")
+    assert out["row"].tolist() == [1, 3, 4], out
+    print("   ✓ Categorical keys (with an unused category) give the same result, no warning")
+
+    # Step 4: Random data against the reference, input order kept
+    print("\n4. Random data vs reference...")
+    df = random_orders(2_000)
+    for keys in (["order_id"], ["order_id", "user_id"]):
+        out = dedupe_keep_latest(df, keys, "created_at")
+        pd.testing.assert_frame_equal(out, reference_keep_latest(df, keys, "created_at"))
+        assert out["row"].is_monotonic_increasing
+    print(f"   ✓ {len(df)} rows match the reference for both key sets")
+
+    # Step 5: Chunked dedupe equals a single pass
+    print("\n5. Chunked vs single pass...")
+    single = dedupe_keep_latest(df, ["order_id", "user_id"], "created_at")
+    for size in (1, 7, 500, 5_000):
+        chunks = [df.iloc[i:i + size] for i in range(0, len(df), size)]
+        chunked = dedupe_keep_latest_chunks(chunks, ["order_id", "user_id"], "created_at")
+        pd.testing.assert_frame_equal(
+            chunked.sort_values("row").reset_index(drop=True), single
+        )
+    print("   ✓ Same rows and dtypes for chunk sizes 1, 7, 500, 5000")
+
+    # Step 6: Chunks categorized independently (e.g. normalized CSV chunks)
+    print("\n6. Chunks with different categories...")
+    chunks = [
+        c.assign(status=c["status"].astype(str).astype("category"))
+        for c in (df.iloc[:1], df.iloc[1:])
+    ]
+    chunked = dedupe_keep_latest_chunks(chunks, ["order_id", "user_id"], "created_at")
+    assert isinstance(chunked["status"].dtype, pd.CategoricalDtype), chunked.dtypes
+    assert chunked.sort_values("row")["row"].tolist() == single["row"].tolist()
+    print("   ✓ status stays categorical with the union of the chunk categories")
+
+    print("\n" + "=" * 60)
+    print("✓ Keep-latest deduplication working correctly!")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
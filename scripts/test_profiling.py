@@ -0,0 +1,103 @@
+"""
+Test HyperLogLog accuracy and that merged table profiles match a single pass
+"""
+
+from pathlib import Path
+import sys
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from bootcamp_data.profiling import TableProfile, profile_chunks
+from bootcamp_data.sketches import HyperLogLog
+
+
+def random_table(n, seed=0):
+    rng = np.random.default_rng(seed)
+    amount = pd.Series(rng.lognormal(4, 1, n)).mask(rng.random(n) < 0.1)
+    created = pd.to_datetime("2025-01-01", utc=True) + pd.to_timedelta(rng.integers(0, 365, n), unit="D")
+    return pd.DataFrame({
+        "order_id": pd.Series([f"A{i}" for i in rng.integers(0, n // 2, n)], dtype="string"),
+        "status": pd.Categorical(rng.choice(["paid", "refund", None], n)),
+        "amount": amount,
+        "quantity": pd.array(rng.integers(1, 10, n), dtype="Int64"),
+        "created_at": pd.Series(created),
+        "is_paid": rng.random(n) < 0.5,
+    })
+
+
+def main():
+    """Test HyperLogLog and TableProfile.merge"""
+
+    print("=" * 60)
+    print("MERGEABLE PROFILE TEST")
+    print("=" * 60)
+
+    p = 12
+    bound = 3 * 1.04 / np.sqrt(2**p)  # 3x the standard error
+
+    # Step 1: Distinct-count accuracy across cardinalities
+    print(f"\n1. HyperLogLog accuracy (p={p}, bound {bound:.1%})...")
+    for n_distinct in (10, 1_000, 50_000, 1_000_000):
+        values = np.arange(n_distinct).repeat(2)  # every value seen twice
+        est = HyperLogLog(p).update(values).count()
+        err = abs(est - n_distinct) / n_distinct
+        assert err <= bound, (n_distinct, est)
+        print(f"   ✓ {n_distinct:>9,} distinct -> {est:>11,.0f} ({err:.2%} off)")
+    assert HyperLogLog(p).update([None, np.nan, "a", "a"]).count() < 1.5
+    print("   ✓ Missing values ignored, duplicates counted once")
+
+    # Step 2: Merged sketches equal a single pass exactly
+    print("\n2. HyperLogLog merge...")
+    values = pd.Series([f"user_{i}" for i in range(100_000)])
+    single = HyperLogLog(p).update(values)
+    merged = HyperLogLog(p)
+    for i in range(0, len(values), 15_000):
+        part = values.iloc[i:i + 15_000]
+        merged.merge(HyperLogLog(p).update(part))
+    assert np.array_equal(merged.registers, single.registers)
+    print("   ✓ Registers identical to a single pass")
+
+    # Step 3: Merged table profiles equal a single pass
+    print("\n3. TableProfile merge vs single pass...")
+    df = random_table(20_000)
+    single = TableProfile().update(df)
+    parts = [TableProfile().update(df.iloc[i:i + 4_000]) for i in range(0, len(df), 4_000)]
+    merged = parts[0]
+    for part in parts[1:]:
+        merged.merge(part)
+    chunked = profile_chunks(df.iloc[i:i + 3_000] for i in range(0, len(df), 3_000))
+    for other in (merged, chunked):
+        assert other.n_rows == single.n_rows == len(df)
+        pd.testing.assert_frame_equal(other.missingness(), single.missingness())
+        pd.testing.assert_frame_equal(other.summary(), single.summary())
+        for name in ("status", "is_paid"):
+            pd.testing.assert_frame_equal(
+                other.columns[name].histogram(), single.columns[name].histogram()
+            )
+    print("   ✓ Row counts, missingness, distinct counts, min/max and value counts identical")
+
+    # Step 4: Profile values against exact pandas results
+    print("\n4. Profile vs exact statistics...")
+    summary = single.summary()
+    missing = df.isna().sum()
+    assert (summary["n_missing"] == missing[summary.index]).all()
+    for name in df.columns:
+        exact = df[name].nunique()
+        assert abs(summary.loc[name, "n_distinct"] - exact) <= max(1, bound * exact), name
+    assert summary.loc["amount", "min"] == df["amount"].min()
+    assert summary.loc["created_at", "max"] == df["created_at"].max()
+    hist = single.columns["amount"].histogram(bins=20)
+    counts, _ = np.histogram(df["amount"].dropna(), bins=np.r_[hist["lo"], hist["hi"].iloc[-1]])
+    assert hist["count"].sum() == df["amount"].notna().sum()
+    assert np.abs(hist["count"] - counts).max() <= 0.02 * len(df)
+    print("   ✓ Missing counts exact, distinct counts and histograms within sketch error")
+
+    print("\n" + "=" * 60)
+    print("✓ Mergeable profiles working correctly!")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
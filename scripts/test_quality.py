@@ -0,0 +1,147 @@
+"""
+Test parquet footer checks (including datasets where only some row groups have
+statistics) and RuleSet validation of whole frames and chunk streams
+"""
+
+from pathlib import Path
+import sys
+import tempfile
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from bootcamp_data.quality import (
+    assert_parquet_in_range,
+    assert_parquet_no_nulls,
+    assert_parquet_non_empty,
+    parquet_column_stats,
+    RuleSet,
+)
+
+
+def expect_failure(check, *args, **kwargs):
+    """Run a check that must raise AssertionError; return its message"""
+    try:
+        check(*args, **kwargs)
+    except AssertionError as e:
+        return str(e)
+    raise AssertionError(f"{check.__name__} should have failed")
+
+
+def main():
+    """Test parquet footer checks and rule sets"""
+
+    print("=" * 60)
+    print("DATA QUALITY CHECKS TEST")
+    print("=" * 60)
+
+    root = Path(tempfile.mkdtemp())
+
+    # Step 1: Dataset where only one file has statistics
+    print("\n1. Mixed statistics (one file written without)...")
+    mixed = root / "mixed"
+    mixed.mkdir()
+    t = pa.table({"a": [1.0, 2.0, 3.0]})
+    pq.write_table(t, mixed / "a.parquet")
+    pq.write_table(t, mixed / "b.parquet", write_statistics=False)
+    stats = parquet_column_stats(mixed, "a")
+    assert len(stats) == 2 and stats["min"].isna().sum() == 1
+    assert_parquet_non_empty(mixed, "mixed")
+    assert_parquet_no_nulls(mixed, ["a"])
+    assert_parquet_in_range(mixed, "a", lo=0, hi=3)
+    print("   ✓ Valid data passes; the row group without statistics is decoded")
+
+    # Step 2: Bad values in the row group without statistics are still caught
+    print("\n2. Bad values without statistics...")
+    bad = root / "bad"
+    bad.mkdir()
+    pq.write_table(t, bad / "a.parquet")
+    pq.write_table(pa.table({"a": [-1.0, None, 5.0]}), bad / "b.parquet", write_statistics=False)
+    print(f"   ✓ {expect_failure(assert_parquet_no_nulls, bad, ['a'])}")
+    print(f"   ✓ {expect_failure(assert_parquet_in_range, bad, 'a', lo=0)}")
+    print(f"   ✓ {expect_failure(assert_parquet_in_range, bad, 'a', hi=3)}")
+
+    # Step 3: Footer statistics alone decide when present
+    print("\n3. Footer statistics...")
+    single = root / "single.parquet"
+    pq.write_table(pa.table({"a": [1, None, 3]}), single, row_group_size=2)
+    assert parquet_column_stats(single, "a")["null_count"].tolist() == [1, 0]
+    assert_parquet_in_range(single, "a", lo=1, hi=3)
+    print(f"   ✓ {expect_failure(assert_parquet_no_nulls, single, ['a'])}")
+    print(f"   ✓ {expect_failure(assert_parquet_in_range, single, 'a', lo=2)}")
+    print(f"   ✓ {expect_failure(assert_parquet_no_nulls, single, ['b'])}")
+
+    # Step 4: Rule set on one frame collects every violation
+    print("\n4. RuleSet on a whole frame...")
+    rules = (
+        RuleSet("orders")
+        .require_columns(["order_id", "amount", "country"])
+        .non_empty()
+        .unique_key("order_id")
+        .in_range("amount", lo=0, hi=100)
+    )
+    df = pd.DataFrame({
+        "order_id": pd.Series(["A1", "A2", "A2", None, "A3"], dtype="string"),
+        "amount": [10.0, -1.0, 50.0, np.nan, 500.0],
+    })
+    report = rules.validate(df)
+    found = {(v.rule, v.column, v.count) for v in report.violations}
+    assert found == {
+        ("require_columns", None, 1),
+        ("unique_key", "order_id", 1),  # NA
+        ("unique_key", "order_id", 1),  # duplicate A2
+        ("in_range", "amount", 1),  # below 0
+        ("in_range", "amount", 1),  # above 100
+    } and len(report.violations) == 5, report.to_frame()
+    dup = next(v for v in report.violations if "not unique" in v.message)
+    assert dup.sample == [2]
+    print(f"   ✓ {len(report.violations)} violations collected, nothing raised")
+    print(f"   ✓ {expect_failure(report.raise_if_failed).splitlines()[0]}")
+    assert not RuleSet("empty").non_empty().validate(df.iloc[:0]).ok
+    assert RuleSet("na ok").unique_key("order_id", allow_na=True).validate(df.drop(index=2)).ok
+
+    # Step 5: Chunks with no keys (empty or all NA) in the stream
+    print("\n5. Empty and all-NA chunks...")
+    rules = RuleSet("orders").unique_key("order_id")
+    chunks = [
+        pd.DataFrame({"order_id": [None, None]}, dtype="string"),
+        pd.DataFrame({"order_id": []}, dtype="string"),
+        pd.DataFrame({"order_id": ["A1", "A2"]}, index=[2, 3], dtype="string"),
+        pd.DataFrame({"order_id": [None]}, index=[4], dtype="string"),
+        pd.DataFrame({"order_id": ["A2", "A3"]}, index=[5, 6], dtype="string"),
+    ]
+    report = rules.validate_chunks(chunks)
+    assert [(v.message, v.sample) for v in report.violations] == [
+        ("order_id contains NA; 3 rows", [0, 1, 4]),
+        ("order_id not unique; 1 duplicate rows", [5]),
+    ], report.to_frame()
+    print("   ✓ NA rows and the cross-chunk duplicate reported, no IndexError")
+
+    # Step 6: Chunked validation equals a single pass
+    print("\n6. Chunked vs whole frame...")
+    rng = np.random.default_rng(0)
+    n = 50_000
+    df = pd.DataFrame({
+        "order_id": pd.Series(rng.integers(0, 40_000, n).astype(str), dtype="string"),
+        "amount": rng.normal(50, 30, n),
+    })
+    df.loc[rng.random(n) < 0.01, "order_id"] = pd.NA
+    rules = RuleSet("orders", sample_size=3).non_empty().unique_key("order_id").in_range("amount", lo=0)
+    single = rules.validate(df).to_frame()
+    exact_dups = int(df["order_id"].dropna().duplicated().sum())
+    assert single.loc[single["message"].str.contains("not unique"), "count"].item() == exact_dups
+    for size in (1_000, 7_777, n):
+        chunked = rules.validate_chunks(df.iloc[i:i + size] for i in range(0, n, size)).to_frame()
+        pd.testing.assert_frame_equal(chunked, single)
+    print(f"   ✓ Same violations and samples for chunk sizes 1000, 7777, {n} ({exact_dups} duplicates)")
+
+    print("\n" + "=" * 60)
+    print("✓ Data quality checks working correctly!")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
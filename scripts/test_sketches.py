@@ -0,0 +1,100 @@
+"""
+Test QuantileSketch accuracy and that merged sketches match a single pass
+"""
+
+from pathlib import Path
+import sys
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from bootcamp_data.sketches import QuantileSketch, sketch_chunks, sketch_iqr_bounds
+from bootcamp_data.transforms import iqr_bounds
+
+PROBS = np.linspace(0.01, 0.99, 99)
+
+
+def rank_error(sketch, x):
+    """Largest distance from each p in PROBS to the true rank range of the sketch's p-quantile"""
+    xs = np.sort(x)
+    v = sketch.quantile(PROBS)
+    lo = np.searchsorted(xs, v, side="left") / len(xs)
+    hi = np.searchsorted(xs, v, side="right") / len(xs)
+    return float(np.max(np.maximum(0, np.maximum(lo - PROBS, PROBS - hi))))
+
+
+def main():
+    """Test QuantileSketch"""
+
+    print("=" * 60)
+    print("QUANTILE SKETCH TEST")
+    print("=" * 60)
+
+    rng = np.random.default_rng(0)
+    data = {
+        "uniform": rng.uniform(0, 1_000, 200_000),
+        "lognormal": rng.lognormal(4, 1, 200_000),
+        "sorted": np.sort(rng.normal(100, 20, 200_000)),
+        "heavy ties": rng.integers(0, 5, 200_000).astype(float),
+    }
+    k = 200
+    bound = 3 * 1.7 / k  # 3x the documented typical rank error
+
+    # Step 1: Small inputs are exact
+    print("\n1. Small inputs...")
+    x = rng.normal(size=100)
+    sketch = QuantileSketch(k).update(x)
+    assert np.allclose(sketch.quantile([0, 0.5, 1]), np.quantile(x, [0, 0.5, 1], method="inverted_cdf"))
+    assert np.isnan(QuantileSketch(k).quantile(0.5))
+    print("   ✓ Exact below k values; empty sketch returns NaN")
+
+    # Step 2: Rank error of a single pass
+    print(f"\n2. Single-pass rank error (bound {bound:.3f})...")
+    for name, x in data.items():
+        sketch = QuantileSketch(k).update(x)
+        err = rank_error(sketch, x)
+        assert err <= bound, (name, err)
+        assert sketch.n == len(x) and sketch.min == x.min() and sketch.max == x.max()
+        print(f"   ✓ {name}: max rank error {err:.4f}")
+
+    # Step 3: Merged sketches are as accurate as a single pass
+    print("\n3. Merged vs single pass...")
+    for name, x in data.items():
+        single = QuantileSketch(k).update(x)
+        parts = [QuantileSketch(k, seed=i).update(part) for i, part in enumerate(np.array_split(x, 16))]
+        merged = parts[0]
+        for part in parts[1:]:
+            merged.merge(part)
+        err = rank_error(merged, x)
+        assert err <= bound, (name, err)
+        assert (merged.n, merged.min, merged.max) == (single.n, single.min, single.max)
+        print(f"   ✓ {name}: 16-way merge rank error {err:.4f} (single pass {rank_error(single, x):.4f})")
+
+    # Step 4: Chunked sketch gives the same outlier bounds as the exact version
+    print("\n4. IQR bounds from chunks...")
+    s = pd.Series(data["lognormal"]).mask(rng.random(len(data["lognormal"])) < 0.05)
+    chunks = (pd.DataFrame({"amount": s.iloc[i:i + 10_000]}) for i in range(0, len(s), 10_000))
+    sketch = sketch_chunks(chunks, "amount", k=k)
+    assert sketch.n == s.notna().sum()
+    approx, exact = sketch_iqr_bounds(sketch), iqr_bounds(s)
+    spread = s.quantile(0.75) - s.quantile(0.25)
+    assert np.allclose(approx, exact, atol=0.05 * spread), (approx, exact)
+    print(f"   ✓ sketch {np.round(approx, 2)} vs exact {np.round(exact, 2)} (NaN ignored)")
+
+    # Step 5: Mismatched sizes cannot be merged
+    print("\n5. Merge with a different k...")
+    try:
+        QuantileSketch(100).merge(QuantileSketch(200))
+    except ValueError:
+        print("   ✓ ValueError raised")
+    else:
+        raise AssertionError("merge with a different k should fail")
+
+    print("\n" + "=" * 60)
+    print("✓ Quantile sketch working correctly!")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
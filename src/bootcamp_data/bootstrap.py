@@ -3,9 +3,123 @@ Bootstrap statistical utilities for group comparisons and confidence intervals
 """
 from __future__ import annotations
 
+import os
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
 import numpy as np
 import pandas as pd
 
+# Resamples per shard. Each shard has its own child seed, so results do not
+# depend on how shards are spread over workers.
+SHARD_SIZE = 1000
+
+
+# Row-wise reductions for resampled blocks
+_STATS = {"mean": np.mean, "median": np.median}
+
+
+def bootstrap_stat(
+    x: np.ndarray,
+    n_boot: int,
+    rng: np.random.Generator,
+    *,
+    stat: str = "mean",
+    max_bytes: int = 4 * 2**20,
+    out: np.ndarray | None = None,
+) -> np.ndarray:
+    """
+    Statistic of n_boot resamples of x, drawn in blocks of 2-D index arrays
+    
+    Args:
+        x: 1-D numpy array (no NaN)
+        n_boot: Number of bootstrap samples
+        rng: Random generator
+        stat: "mean" or "median"
+        max_bytes: Memory cap for one block (indices + gathered values)
+        out: Optional preallocated array of length n_boot to fill
+        
+    Returns:
+        Array of n_boot resample statistics
+    """
+    reduce = _STATS[stat]
+    n = len(x)
+    block = max(1, min(n_boot, max_bytes // (16 * n)))
+    if out is None:
+        out = np.empty(n_boot)
+    for start in range(0, n_boot, block):
+        stop = min(start + block, n_boot)
+        idx = rng.integers(0, n, size=(stop - start, n))
+        out[start:stop] = reduce(x[idx], axis=1)
+    return out
+
+
+def bootstrap_means(
+    x: np.ndarray,
+    n_boot: int,
+    rng: np.random.Generator,
+    *,
+    max_bytes: int = 4 * 2**20,
+) -> np.ndarray:
+    """
+    Means of n_boot resamples of x (see bootstrap_stat)
+    
+    Args:
+        x: 1-D numpy array (no NaN)
+        n_boot: Number of bootstrap samples
+        rng: Random generator
+        max_bytes: Memory cap for one block (indices + gathered values)
+        
+    Returns:
+        Array of n_boot resample means
+    """
+    return bootstrap_stat(x, n_boot, rng, stat="mean", max_bytes=max_bytes)
+
+
+def run_sharded(
+    fn: Callable[..., np.ndarray],
+    n_boot: int,
+    seed: int,
+    n_jobs: int = 1,
+) -> np.ndarray:
+    """
+    Run fn(n, seed_seq) over fixed-size shards of n_boot resamples
+    
+    Shard seeds come from numpy.random.SeedSequence(seed).spawn, so the
+    concatenated result is bit-identical for any n_jobs.
+    
+    Args:
+        fn: Picklable function (e.g. functools.partial of a module-level
+            function) returning the statistics for n resamples
+        n_boot: Total number of resamples
+        seed: Root random seed
+        n_jobs: Worker processes (1 runs inline, -1 uses all cores)
+        
+    Returns:
+        Concatenated results of all shards (along axis 0)
+    """
+    sizes = [min(SHARD_SIZE, n_boot - i) for i in range(0, n_boot, SHARD_SIZE)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    workers = min(len(sizes), (os.cpu_count() or 1) if n_jobs == -1 else n_jobs)
+    if workers <= 1:
+        parts = [fn(n, ss) for n, ss in zip(sizes, seeds)]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as ex:
+            parts = list(ex.map(fn, sizes, seeds))
+    return np.concatenate(parts)
+
+
+def _diff_means_shard(
+    a: np.ndarray,
+    b: np.ndarray,
+    max_bytes: int,
+    n: int,
+    seed_seq: np.random.SeedSequence,
+) -> np.ndarray:
+    rng = np.random.default_rng(seed_seq)
+    return bootstrap_means(a, n, rng, max_bytes=max_bytes) - bootstrap_means(b, n, rng, max_bytes=max_bytes)
+
 
 def bootstrap_diff_means(
     a: pd.Series,
@@ -13,18 +127,25 @@ def bootstrap_diff_means(
     *,
     n_boot: int = 2000,
     seed: int = 0,
+    max_bytes: int = 4 * 2**20,
+    n_jobs: int = 1,
 ) -> dict[str, float]:
     """
     Bootstrap confidence interval for difference in means (A - B).
     
     For rates, pass 0/1 Series (e.g., is_refund.astype(int)).
-    For medians, use numpy.median instead of .mean() in the loop.
+    Resamples are drawn in blocks as 2-D index arrays and averaged with one
+    array reduction per block; max_bytes caps the block size. With n_jobs > 1
+    shards of resamples run in a process pool; results are the same for any
+    n_jobs.
     
     Args:
         a: First group (Series or array-like)
         b: Second group (Series or array-like)
         n_boot: Number of bootstrap samples (default 2000)
         seed: Random seed for reproducibility (default 0)
+        max_bytes: Memory cap for one resampling block (default 4 MiB)
+        n_jobs: Worker processes (default 1; -1 uses all cores)
         
     Returns:
         Dictionary with:
@@ -32,28 +153,14 @@ def bootstrap_diff_means(
         - ci_low: lower 95% CI bound (2.5th percentile)
         - ci_high: upper 95% CI bound (97.5th percentile)
     """
-    # Setup random number generator
-    rng = np.random.default_rng(seed)
-    
     # Convert to numpy, handle NaN
-    a = pd.to_numeric(a, errors="coerce").dropna().to_numpy()
-    b = pd.to_numeric(b, errors="coerce").dropna().to_numpy()
+    a = pd.to_numeric(pd.Series(a), errors="coerce").dropna().to_numpy(dtype="float64")
+    b = pd.to_numeric(pd.Series(b), errors="coerce").dropna().to_numpy(dtype="float64")
     
     assert len(a) > 0 and len(b) > 0, "Empty group after cleaning"
     
-    # Store bootstrap differences
-    diffs = []
-    
-    # Run bootstrap
-    for _ in range(n_boot):
-        # Resample with replacement
-        sa = rng.choice(a, size=len(a), replace=True)
-        sb = rng.choice(b, size=len(b), replace=True)
-        
-        # Compute difference in means
-        diffs.append(sa.mean() - sb.mean())
-    
-    diffs = np.array(diffs)
+    # Bootstrap differences in means
+    diffs = run_sharded(partial(_diff_means_shard, a, b, max_bytes), n_boot, seed, n_jobs)
     
     # Return observed diff + CI
     return {
@@ -61,3 +168,179 @@ def bootstrap_diff_means(
         "ci_low": float(np.quantile(diffs, 0.025)),
         "ci_high": float(np.quantile(diffs, 0.975)),
     }
+
+
+def bootstrap_diff_rates(
+    n_a: int,
+    k_a: int,
+    n_b: int,
+    k_b: int,
+    *,
+    n_boot: int = 2000,
+    seed: int = 0,
+) -> dict[str, float]:
+    """
+    Bootstrap confidence interval for a difference in rates (A - B) from counts.
+    
+    Resampling a 0/1 series and taking its mean is the same as drawing
+    Binomial(n, k/n) / n, so each resample costs O(1) instead of O(n).
+    
+    Args:
+        n_a: Rows in group A
+        k_a: Successes in group A (e.g. refunds)
+        n_b: Rows in group B
+        k_b: Successes in group B
+        n_boot: Number of bootstrap samples (default 2000)
+        seed: Random seed for reproducibility (default 0)
+        
+    Returns:
+        Dictionary with:
+        - diff_mean: observed difference in rates (A - B)
+        - ci_low: lower 95% CI bound (2.5th percentile)
+        - ci_high: upper 95% CI bound (97.5th percentile)
+    """
+    assert n_a > 0 and n_b > 0, "Empty group"
+    rng = np.random.default_rng(seed)
+    diffs = rng.binomial(n_a, k_a / n_a, size=n_boot) / n_a - rng.binomial(n_b, k_b / n_b, size=n_boot) / n_b
+    return {
+        "diff_mean": float(k_a / n_a - k_b / n_b),
+        "ci_low": float(np.quantile(diffs, 0.025)),
+        "ci_high": float(np.quantile(diffs, 0.975)),
+    }
+
+
+def _row_quantiles(sorted_rows: np.ndarray, qs: list[float]) -> np.ndarray:
+    """Per-row quantiles of row-sorted data (linear interpolation, like np.quantile)."""
+    pos = np.asarray(qs) * (sorted_rows.shape[1] - 1)
+    lo = np.floor(pos).astype(int)
+    hi = np.minimum(lo + 1, sorted_rows.shape[1] - 1)
+    frac = pos - lo
+    return sorted_rows[:, lo] + frac * (sorted_rows[:, hi] - sorted_rows[:, lo])
+
+
+def bootstrap_rate_cis(
+    n: pd.Series,
+    k: pd.Series,
+    *,
+    n_boot: int = 2000,
+    seed: int = 0,
+    ci: float = 0.95,
+    max_bytes: int = 64 * 2**20,
+) -> pd.DataFrame:
+    """
+    Bootstrap confidence intervals for many rates at once from counts.
+    
+    One cell per row (e.g. country x month); all cells are resampled together
+    as a 2-D binomial draw, in blocks of cells capped by max_bytes.
+    
+    Args:
+        n: Rows per cell (Series or array-like)
+        k: Successes per cell, aligned with n
+        n_boot: Number of bootstrap samples (default 2000)
+        seed: Random seed for reproducibility (default 0)
+        ci: Confidence level (default 0.95)
+        max_bytes: Memory cap for one block of draws (default 64 MiB)
+        
+    Returns:
+        DataFrame (index of n) with n, successes, rate, ci_low, ci_high;
+        cells with n == 0 get NaN
+    """
+    index = n.index if isinstance(n, pd.Series) else None
+    n = np.asarray(n, dtype="int64")
+    k = np.asarray(k, dtype="int64")
+    rate = np.divide(k, n, out=np.full(len(n), np.nan), where=n > 0)
+    p = np.nan_to_num(rate)
+
+    rng = np.random.default_rng(seed)
+    alpha = (1 - ci) / 2
+    bounds = np.full((len(n), 2), np.nan)
+    block = max(1, max_bytes // (8 * n_boot))
+    for start in range(0, len(n), block):
+        nb, pb = n[start:start + block, None], p[start:start + block, None]
+        # Sorting integer counts is much cheaper than np.quantile on floats
+        draws = np.sort(rng.binomial(nb, pb, size=(len(nb), n_boot)), axis=1)
+        bounds[start:start + block] = _row_quantiles(draws, [alpha, 1 - alpha]) / np.maximum(nb, 1)
+    bounds[n == 0] = np.nan
+
+    return pd.DataFrame(
+        {"n": n, "successes": k, "rate": rate, "ci_low": bounds[:, 0], "ci_high": bounds[:, 1]},
+        index=index,
+    )
+
+
+def bootstrap_groups(
+    df: pd.DataFrame,
+    group_col: str,
+    metric_col: str,
+    *,
+    stat: str = "mean",
+    n_boot: int = 2000,
+    seed: int = 0,
+    ci: float = 0.95,
+    max_bytes: int = 4 * 2**20,
+) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Bootstrap CIs for every group and every pairwise difference in one run.
+    
+    Groups are factorized once and each group's resampled statistics are
+    written into one shared (groups x n_boot) matrix; all pairwise
+    differences are then taken from that matrix in one vectorized step.
+    
+    Args:
+        df: DataFrame (e.g. the analytics table)
+        group_col: Group column (e.g. "country"); rows with a missing group are dropped
+        metric_col: Metric column; rows with a missing metric are dropped
+        stat: "mean", "median" or "rate" (0/1 or bool metric, resampled from counts)
+        n_boot: Number of bootstrap samples (default 2000)
+        seed: Random seed for reproducibility (default 0)
+        ci: Confidence level (default 0.95)
+        max_bytes: Memory cap for one resampling block (default 4 MiB)
+        
+    Returns:
+        Tuple of (groups, pairs):
+        - groups: indexed by group with n, estimate, ci_low, ci_high
+        - pairs: group_a, group_b, diff (a - b), ci_low, ci_high
+    """
+    x = pd.to_numeric(df[metric_col], errors="coerce").astype("float64").to_numpy(na_value=np.nan)
+    codes, groups = pd.factorize(df[group_col], sort=True)
+    keep = (codes >= 0) & ~np.isnan(x)
+    codes, x = codes[keep], x[keep]
+    assert len(groups) > 0 and len(x) > 0, "Empty groups after cleaning"
+
+    # Values contiguous per group
+    order = np.argsort(codes, kind="stable")
+    n = np.bincount(codes, minlength=len(groups))
+    values = np.split(x[order], np.cumsum(n)[:-1])
+
+    rngs = [np.random.default_rng(ss) for ss in np.random.SeedSequence(seed).spawn(len(groups))]
+    boot = np.full((len(groups), n_boot), np.nan)
+    if stat == "rate":
+        k = np.array([v.sum() for v in values])
+        estimate = np.divide(k, n, out=np.full(len(n), np.nan), where=n > 0)
+        for g, rng in enumerate(rngs):
+            if n[g]:
+                boot[g] = rng.binomial(n[g], estimate[g], size=n_boot) / n[g]
+    else:
+        estimate = np.array([_STATS[stat](v) if len(v) else np.nan for v in values])
+        for g, rng in enumerate(rngs):
+            if n[g]:
+                bootstrap_stat(values[g], n_boot, rng, stat=stat, max_bytes=max_bytes, out=boot[g])
+
+    alpha = (1 - ci) / 2
+    lo, hi = np.quantile(boot, [alpha, 1 - alpha], axis=1)
+    group_ci = pd.DataFrame(
+        {"n": n, "estimate": estimate, "ci_low": lo, "ci_high": hi},
+        index=pd.Index(groups, name=group_col),
+    )
+
+    ia, ib = np.triu_indices(len(groups), k=1)
+    diffs = boot[ia] - boot[ib]
+    lo, hi = np.quantile(diffs, [alpha, 1 - alpha], axis=1) if len(ia) else (np.empty(0), np.empty(0))
+    pairs = pd.DataFrame({
+        "group_a": np.asarray(groups)[ia],
+        "group_b": np.asarray(groups)[ib],
+        "diff": estimate[ia] - estimate[ib],
+        "ci_low": lo,
+        "ci_high": hi,
+    })
+    return group_ci, pairs
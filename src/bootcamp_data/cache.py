@@ -0,0 +1,338 @@
+"""
+Content-addressed cache for pipeline stages (stored under Paths.cache)
+"""
+
+import functools
+import hashlib
+import inspect
+import logging
+import os
+import sysconfig
+import types
+import weakref
+from collections.abc import Callable
+from pathlib import Path
+
+import pandas as pd
+
+log = logging.getLogger(__name__)
+
+
+def file_fingerprint(path: Path) -> str:
+    """
+    Cheap fingerprint of a file from its path, size and modification time
+
+    A directory (e.g. a partitioned parquet dataset) is fingerprinted by the
+    relative paths, sizes and modification times of all files under it.
+
+    Args:
+        path: File (or directory) to fingerprint
+
+    Returns:
+        Fingerprint string
+    """
+    path = Path(path)
+    if path.is_dir():
+        h = hashlib.sha256()
+        for f in sorted(x for x in path.rglob("*") if x.is_file()):
+            st = f.stat()
+            h.update(f"{f.relative_to(path)}:{st.st_size}:{st.st_mtime_ns}\0".encode())
+        return f"dir:{path.resolve()}:{h.hexdigest()}"
+    st = path.stat()
+    return f"file:{path.resolve()}:{st.st_size}:{st.st_mtime_ns}"
+
+
+def frame_fingerprint(df: pd.DataFrame) -> str:
+    """
+    Fingerprint of a DataFrame's contents (values, index, columns and dtypes)
+
+    Args:
+        df: DataFrame to fingerprint
+
+    Returns:
+        Hex digest
+    """
+    h = hashlib.sha256()
+    h.update(repr(list(df.columns)).encode())
+    h.update(repr([str(t) for t in df.dtypes]).encode())
+    h.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    return h.hexdigest()
+
+
+# Modules installed here (stdlib, site-packages) are not fingerprinted
+_INSTALLED = tuple(
+    str(Path(sysconfig.get_paths()[k]).resolve()) for k in ("stdlib", "platstdlib", "purelib", "platlib")
+)
+
+
+@functools.lru_cache(maxsize=None)
+def _file_digest(path: str, mtime_ns: int) -> str:
+    return hashlib.sha256(Path(path).read_bytes()).hexdigest()
+
+
+def _project_module_file(module) -> str | None:
+    path = getattr(module, "__file__", None)
+    if not path or not path.endswith(".py"):
+        return None
+    path = str(Path(path).resolve())
+    return None if path.startswith(_INSTALLED) else path
+
+
+def module_fingerprint(module: types.ModuleType) -> str:
+    """
+    Fingerprint of a module's source and of every project module it imports from
+    
+    Helpers, constants (e.g. a mapping dict) and imported project code used
+    by a stage all live in these files, so editing any of them changes the
+    fingerprint. Installed packages and the standard library are skipped.
+    
+    Args:
+        module: Module defining a stage function
+        
+    Returns:
+        Hex digest
+    """
+    h = hashlib.sha256()
+    seen, todo = set(), [module]
+    while todo:
+        mod = todo.pop()
+        path = _project_module_file(mod)
+        if path is None or path in seen:
+            continue
+        seen.add(path)
+        for value in vars(mod).values():
+            dep = value if isinstance(value, types.ModuleType) else inspect.getmodule(value)
+            if dep is not None:
+                todo.append(dep)
+    for path in sorted(seen):
+        h.update(f"{path}:{_file_digest(path, os.stat(path).st_mtime_ns)}\0".encode())
+    return h.hexdigest()
+
+
+def function_fingerprint(fn: Callable, version: str = "") -> str:
+    """
+    Fingerprint of a stage function: qualified name, source, version and the
+    source of the modules it depends on (see module_fingerprint)
+    
+    Args:
+        fn: Stage function
+        version: Extra version tag (bump to invalidate by hand)
+        
+    Returns:
+        Fingerprint string
+    """
+    try:
+        source = inspect.getsource(fn)
+    except (OSError, TypeError):
+        source = ""
+    module = inspect.getmodule(fn)
+    deps = module_fingerprint(module) if module is not None else ""
+    return f"{fn.__module__}.{fn.__qualname__}:{version}:{deps}:{source}"
+
+
+class LazyResult:
+    """
+    A stage result that is only read (or computed) when asked for
+
+    It carries the stage's cache key, so later stages can be keyed on it
+    without reading it; see StageCache.run(..., lazy=True).
+    """
+
+    def __init__(self, key: str, compute: Callable[[], pd.DataFrame]):
+        self.key = key
+        self._compute = compute
+        self._value: pd.DataFrame | None = None
+
+    def result(self) -> pd.DataFrame:
+        """
+        The stage result: read from the cache, or computed (upstream first) on a miss
+
+        Returns:
+            Stage result
+        """
+        if self._value is None:
+            self._value = self._compute()
+            self._compute = None
+        return self._value
+
+
+def _resolve(obj):
+    return obj.result() if isinstance(obj, LazyResult) else obj
+
+
+class StageCache:
+    """
+    Memoize DataFrame-producing pipeline stages on disk
+
+    A stage result is keyed by a hash of the function (name, source, version,
+    and the source of its module and the project modules that imports), its
+    parameters and the fingerprints of its inputs. Path inputs are
+    fingerprinted by size/mtime; DataFrame inputs that came out of this cache
+    (run or load) are identified by their cache key, others by content.
+    With lazy=True, run and load return LazyResults: a chain of stages is
+    keyed without reading anything, and only the result asked for at the end
+    is read back (upstream stages are read or run only on a miss).
+    Results are stored as parquet files; when the cache grows past max_bytes
+    the least recently used entries are evicted.
+
+    Treat DataFrames returned by the cache as immutable: an in-place change
+    would not be reflected in their key.
+    """
+
+    def __init__(self, root: Path, *, max_bytes: int = 1 << 30):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self._lineage: dict[int, tuple[weakref.ref, str]] = {}
+
+    def _remember(self, df: pd.DataFrame, key: str) -> pd.DataFrame:
+        self._lineage[id(df)] = (weakref.ref(df), key)
+        return df
+
+    def fingerprint(self, obj) -> str:
+        """
+        Fingerprint one stage argument
+
+        Args:
+            obj: Path, DataFrame or any value with a stable repr
+
+        Returns:
+            Fingerprint string
+        """
+        if isinstance(obj, Path):
+            return file_fingerprint(obj)
+        if isinstance(obj, LazyResult):
+            return f"stage:{obj.key}"
+        if isinstance(obj, pd.DataFrame):
+            entry = self._lineage.get(id(obj))
+            if entry is not None and entry[0]() is obj:
+                return f"stage:{entry[1]}"
+            return f"frame:{frame_fingerprint(obj)}"
+        return repr(obj)
+
+    def key(self, fn: Callable, args: tuple, kwargs: dict, version: str = "") -> str:
+        """
+        Cache key for calling fn(*args, **kwargs)
+
+        Args:
+            fn: Stage function
+            args: Positional arguments
+            kwargs: Keyword arguments
+            version: Extra version tag
+
+        Returns:
+            Hex digest
+        """
+        h = hashlib.sha256(function_fingerprint(fn, version).encode())
+        for a in args:
+            h.update(b"\0" + self.fingerprint(a).encode())
+        for name in sorted(kwargs):
+            h.update(f"\0{name}=".encode() + self.fingerprint(kwargs[name]).encode())
+        return h.hexdigest()
+
+    def path(self, key: str) -> Path:
+        return self.root / f"{key}.parquet"
+
+    def get(self, key: str) -> pd.DataFrame | None:
+        """
+        Cached result for a key, or None on a miss
+        
+        Args:
+            key: Cache key
+            
+        Returns:
+            Cached DataFrame or None
+        """
+        path = self.path(key)
+        if not path.exists():
+            return None
+        os.utime(path)
+        return self._remember(pd.read_parquet(path), key)
+
+    def put(self, key: str, result: pd.DataFrame) -> pd.DataFrame:
+        """
+        Store a result under a key (then evict down to max_bytes)
+        
+        Args:
+            key: Cache key
+            result: DataFrame to store
+            
+        Returns:
+            result, remembered under key
+        """
+        path = self.path(key)
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        result.to_parquet(tmp)
+        os.replace(tmp, path)
+        self.evict()
+        return self._remember(result, key)
+
+    def run(
+        self, fn: Callable, *args, version: str = "", lazy: bool = False, **kwargs
+    ) -> pd.DataFrame | LazyResult:
+        """
+        Return fn(*args, **kwargs), from the cache when its inputs are unchanged
+        
+        Args:
+            fn: Stage function returning a DataFrame
+            *args: Positional arguments for fn (LazyResults are resolved
+                only if fn has to run)
+            version: Extra version tag for the stage
+            lazy: Return a LazyResult instead of reading/running now
+            **kwargs: Keyword arguments for fn
+            
+        Returns:
+            Stage result (LazyResult when lazy)
+        """
+        key = self.key(fn, args, kwargs, version)
+
+        def compute() -> pd.DataFrame:
+            cached = self.get(key)
+            if cached is not None:
+                log.info("Cache hit: %s (%s)", fn.__name__, key[:12])
+                return cached
+            log.info("Cache miss: %s (%s)", fn.__name__, key[:12])
+            result = fn(*map(_resolve, args), **{k: _resolve(v) for k, v in kwargs.items()})
+            return self.put(key, result)
+
+        return LazyResult(key, compute) if lazy else compute()
+
+    def load(self, fn: Callable, path: Path, *, lazy: bool = False, **kwargs) -> pd.DataFrame | LazyResult:
+        """
+        Read an input with fn(path, **kwargs) without caching it
+
+        The result is keyed by the file fingerprint, so stages that consume it
+        don't have to hash its contents.
+
+        Args:
+            fn: Reader function (e.g. read_parquet)
+            path: File to read
+            lazy: Return a LazyResult, read only if a stage using it has to run
+            **kwargs: Keyword arguments for fn
+
+        Returns:
+            DataFrame read from path (LazyResult when lazy)
+        """
+        key = self.key(fn, (Path(path),), kwargs)
+
+        def compute() -> pd.DataFrame:
+            return self._remember(fn(path, **kwargs), key)
+
+        return LazyResult(key, compute) if lazy else compute()
+
+    def evict(self) -> None:
+        """
+        Delete least recently used entries until the cache fits in max_bytes
+        """
+        entries = sorted(
+            (st.st_mtime_ns, st.st_size, p)
+            for p in self.root.glob("*.parquet")
+            for st in [p.stat()]
+        )
+        total = sum(size for _, size, _ in entries)
+        for _, size, p in entries:
+            if total <= self.max_bytes:
+                break
+            log.info("Cache evict: %s", p.name)
+            p.unlink(missing_ok=True)
+            total -= size
@@ -0,0 +1,94 @@
+"""
+High-water mark bookkeeping for incremental (append-only) builds
+"""
+
+import hashlib
+import json
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+
+@dataclass(frozen=True)
+class Watermark:
+    source: str
+    offset: int
+    header: str
+    checksum: str
+
+
+def _read_header(path: Path) -> str:
+    with open(path, "rb") as f:
+        return f.readline().decode("utf-8").rstrip("\r\n")
+
+
+# Bytes hashed at each end of the processed part: enough to catch a
+# regenerated file, while the cost stays fixed as the history grows
+CHECKSUM_WINDOW = 64 << 10
+
+
+def _window_checksum(path: Path, offset: int, window: int = CHECKSUM_WINDOW) -> str:
+    """SHA-256 of the first and the last window bytes before offset (the part already processed)."""
+    h = hashlib.sha256(str(offset).encode())
+    with open(path, "rb") as f:
+        h.update(f.read(min(window, offset)))
+        start = max(window, offset - window)
+        if start < offset:
+            f.seek(start)
+            h.update(f.read(offset - start))
+    return h.hexdigest()
+
+
+def load_watermark(state_path: Path, source: Path) -> Watermark | None:
+    """
+    Load the saved high-water mark for a source file, if it is still valid
+    
+    The mark is discarded when the source was replaced rather than appended
+    to: a different header, a file now shorter than the saved offset, or
+    different bytes before the offset. Those are checked with a checksum of
+    the first and last CHECKSUM_WINDOW bytes before the offset, so a
+    regenerated file of the same or greater length is detected too, while a
+    run reads a fixed amount however long the processed history gets.
+    
+    Args:
+        state_path: JSON state file (under Paths.cache)
+        source: Source CSV the mark refers to
+        
+    Returns:
+        Watermark, or None when a full rebuild is needed
+    """
+    if not state_path.exists():
+        return None
+    try:
+        wm = Watermark(**json.loads(state_path.read_text()))
+    except (TypeError, ValueError):
+        return None  # unreadable, or written before checksums were stored
+    if wm.source != str(source) or wm.header != _read_header(source):
+        return None
+    if source.stat().st_size < wm.offset:
+        return None
+    if _window_checksum(source, wm.offset) != wm.checksum:
+        return None
+    return wm
+
+
+def save_watermark(state_path: Path, source: Path, offset: int) -> Watermark:
+    """
+    Save the high-water mark reached for a source file
+    
+    Args:
+        state_path: JSON state file (under Paths.cache)
+        source: Source CSV the mark refers to
+        offset: Byte offset up to which source has been processed
+        
+    Returns:
+        The saved Watermark
+    """
+    wm = Watermark(
+        source=str(source),
+        offset=offset,
+        header=_read_header(source),
+        checksum=_window_checksum(source, offset),
+    )
+    state_path.parent.mkdir(parents=True, exist_ok=True)
+    state_path.write_text(json.dumps(asdict(wm), indent=2))
+    return wm
@@ -2,46 +2,284 @@
 Input/Output module for bootcamp data
 """
 
+import itertools
+import shutil
+from collections.abc import Iterable, Iterator
+from io import BytesIO
 from pathlib import Path
 import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pv
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from pandas._libs.parsers import STR_NA_VALUES
 
 NA = ["", "NA", "N/A", "null", "None", "not_a_number"]
 
+# pyarrow has no keep_default_na: add pandas' default NA tokens (#N/A, n/a,
+# NaN, NULL, ...) so both CSV engines return the same nulls
+ARROW_NA = sorted(set(NA) | STR_NA_VALUES)
 
-def read_orders_csv(path: Path) -> pd.DataFrame:
+ORDERS_DTYPES = {"order_id": "string", "user_id": "string"}
+USERS_DTYPES = {"user_id": "string"}
+
+# Chunked readers also pin the free-text columns: a chunk in which one of them
+# is entirely NA would otherwise come back as float64, and the first chunk
+# fixes the column types of a streamed output file.
+ORDERS_CHUNK_DTYPES = ORDERS_DTYPES | {"created_at": "string", "status": "string"}
+USERS_CHUNK_DTYPES = USERS_DTYPES | {"country": "string", "signup_date": "string"}
+
+# Explicit Arrow column types for the Arrow ingestion engine. Text columns are
+# pinned to string so results line up with the pandas readers (no timestamp
+# inference on created_at / signup_date).
+ORDERS_ARROW_TYPES = {
+    "order_id": pa.string(),
+    "user_id": pa.string(),
+    "amount": pa.float64(),
+    "quantity": pa.int64(),
+    "created_at": pa.string(),
+    "status": pa.string(),
+}
+USERS_ARROW_TYPES = {
+    "user_id": pa.string(),
+    "country": pa.string(),
+    "signup_date": pa.string(),
+}
+
+# Rows sampled from the head of a file to estimate bytes per row
+_SAMPLE_ROWS = 1000
+
+
+def read_orders_csv(path: Path, *, engine: str = "pandas") -> pd.DataFrame:
     """
     Read orders from CSV file with custom NA values handling
     
     Args:
         path: Path to CSV file
+        engine: "pandas" (C parser) or "pyarrow" (multi-threaded Arrow parser,
+            returns Arrow-backed columns)
         
     Returns:
         DataFrame with orders data
     """
+    if engine == "pyarrow":
+        return read_orders_arrow(path).to_pandas(types_mapper=pd.ArrowDtype)
     return pd.read_csv(
         path,
-        dtype={"order_id": "string", "user_id": "string"},
+        dtype=ORDERS_DTYPES,
         na_values=NA,
         keep_default_na=True,
     )
 
 
-def read_users_csv(path: Path) -> pd.DataFrame:
+def read_users_csv(path: Path, *, engine: str = "pandas") -> pd.DataFrame:
     """
     Read users from CSV file with custom NA values handling
     
     Args:
         path: Path to CSV file
+        engine: "pandas" (C parser) or "pyarrow" (multi-threaded Arrow parser,
+            returns Arrow-backed columns)
         
     Returns:
         DataFrame with users data
     """
+    if engine == "pyarrow":
+        return read_users_arrow(path).to_pandas(types_mapper=pd.ArrowDtype)
     return pd.read_csv(
         path,
-        dtype={"user_id": "string"},
+        dtype=USERS_DTYPES,
+        na_values=NA,
+        keep_default_na=True,
+    )
+
+
+def read_csv_arrow(
+    path: Path,
+    column_types: dict[str, pa.DataType],
+    *,
+    use_threads: bool = True,
+    block_size: int | None = None,
+) -> pa.Table:
+    """
+    Read a CSV file into an Arrow table with pyarrow's multi-threaded parser
+    
+    The NA tokens (and pandas' default ones, as with keep_default_na=True)
+    are mapped to nulls for every column, including strings.
+    
+    Args:
+        path: Path to CSV file
+        column_types: Explicit Arrow types per column (others are inferred)
+        use_threads: Parse blocks in parallel across cores
+        block_size: Bytes per parse block (pyarrow default when None)
+        
+    Returns:
+        Arrow table
+        
+    Raises:
+        pyarrow.ArrowInvalid: If a non-NA value does not match its column type
+    """
+    read_options = pv.ReadOptions(use_threads=use_threads)
+    if block_size is not None:
+        read_options.block_size = block_size
+    convert_options = pv.ConvertOptions(
+        column_types=column_types,
+        null_values=ARROW_NA,
+        strings_can_be_null=True,
+    )
+    return pv.read_csv(path, read_options=read_options, convert_options=convert_options)
+
+
+def read_orders_arrow(path: Path, **kwargs) -> pa.Table:
+    """
+    Read orders from CSV into an Arrow table
+    
+    Args:
+        path: Path to CSV file
+        **kwargs: Passed to read_csv_arrow (use_threads, block_size)
+        
+    Returns:
+        Arrow table with orders data
+    """
+    return read_csv_arrow(path, ORDERS_ARROW_TYPES, **kwargs)
+
+
+def read_users_arrow(path: Path, **kwargs) -> pa.Table:
+    """
+    Read users from CSV into an Arrow table
+    
+    Args:
+        path: Path to CSV file
+        **kwargs: Passed to read_csv_arrow (use_threads, block_size)
+        
+    Returns:
+        Arrow table with users data
+    """
+    return read_csv_arrow(path, USERS_ARROW_TYPES, **kwargs)
+
+
+def read_orders_csv_since(path: Path, offset: int = 0) -> tuple[pd.DataFrame, int]:
+    """
+    Read only the orders appended to a CSV file after a byte offset
+    
+    A trailing partial line (file still being written) is left for the next
+    call. Offset 0 reads the whole file.
+    
+    Args:
+        path: Path to CSV file
+        offset: Byte offset returned by the previous call
+        
+    Returns:
+        Tuple of (new orders DataFrame, offset to resume from)
+    """
+    with open(path, "rb") as f:
+        header = f.readline()
+        start = max(offset, f.tell())
+        f.seek(start)
+        data = f.read()
+    end = data.rfind(b"\n") + 1
+    df = pd.read_csv(
+        BytesIO(header + data[:end]),
+        dtype=ORDERS_DTYPES,
         na_values=NA,
         keep_default_na=True,
     )
+    return df, start + end
+
+
+def rows_per_chunk(path: Path, chunk_bytes: int) -> int:
+    """
+    Estimate how many CSV rows fit in a byte budget
+    
+    Args:
+        path: Path to CSV file
+        chunk_bytes: Target size of one chunk on disk, in bytes
+        
+    Returns:
+        Number of rows per chunk (at least 1)
+    """
+    with open(path, "rb") as f:
+        f.readline()  # header
+        sample = [len(line) for _, line in zip(range(_SAMPLE_ROWS), f)]
+    if not sample:
+        return 1
+    return max(1, chunk_bytes * len(sample) // sum(sample))
+
+
+def iter_csv(
+    path: Path,
+    dtype: dict[str, str],
+    *,
+    chunksize: int | None = 100_000,
+    chunk_bytes: int | None = None,
+) -> Iterator[pd.DataFrame]:
+    """
+    Stream a CSV file as typed, NA-normalized chunks
+    
+    Args:
+        path: Path to CSV file
+        dtype: Column dtypes; pin every column whose type could differ
+            between chunks (e.g. text that is all-NA in one chunk)
+        chunksize: Rows per chunk
+        chunk_bytes: Byte budget per chunk; overrides chunksize when given
+        
+    Returns:
+        Iterator of DataFrames with at most chunksize rows each
+    """
+    if chunk_bytes is not None:
+        chunksize = rows_per_chunk(path, chunk_bytes)
+    if chunksize is None:
+        raise ValueError("Either chunksize or chunk_bytes is required")
+    with pd.read_csv(
+        path,
+        dtype=dtype,
+        na_values=NA,
+        keep_default_na=True,
+        chunksize=chunksize,
+    ) as reader:
+        yield from reader
+
+
+def iter_orders_csv(
+    path: Path,
+    *,
+    chunksize: int | None = 100_000,
+    chunk_bytes: int | None = None,
+) -> Iterator[pd.DataFrame]:
+    """
+    Stream orders from CSV in chunks (same NA values as read_orders_csv; text
+    columns are read as string so every chunk has the same column types)
+    
+    Args:
+        path: Path to CSV file
+        chunksize: Rows per chunk
+        chunk_bytes: Byte budget per chunk; overrides chunksize when given
+        
+    Returns:
+        Iterator of orders DataFrames
+    """
+    return iter_csv(path, ORDERS_CHUNK_DTYPES, chunksize=chunksize, chunk_bytes=chunk_bytes)
+
+
+def iter_users_csv(
+    path: Path,
+    *,
+    chunksize: int | None = 100_000,
+    chunk_bytes: int | None = None,
+) -> Iterator[pd.DataFrame]:
+    """
+    Stream users from CSV in chunks (same NA values as read_users_csv; text
+    columns are read as string so every chunk has the same column types)
+    
+    Args:
+        path: Path to CSV file
+        chunksize: Rows per chunk
+        chunk_bytes: Byte budget per chunk; overrides chunksize when given
+        
+    Returns:
+        Iterator of users DataFrames
+    """
+    return iter_csv(path, USERS_CHUNK_DTYPES, chunksize=chunksize, chunk_bytes=chunk_bytes)
 
 
 def read_orders_json(path: str | Path) -> pd.DataFrame:
@@ -72,14 +310,197 @@ def write_parquet(df: pd.DataFrame, path: Path) -> None:
     df.to_parquet(path, index=False)
 
 
-def read_parquet(path: str | Path) -> pd.DataFrame:
+def _chunk_schema(schema: pa.Schema) -> pa.Schema:
+    """Schema for a chunk stream: columns typed null (all-NA text) become string."""
+    fields = []
+    for f in schema:
+        if pa.types.is_null(f.type):
+            f = f.with_type(pa.string())
+        elif pa.types.is_dictionary(f.type) and pa.types.is_null(f.type.value_type):
+            f = f.with_type(pa.dictionary(f.type.index_type, pa.string()))
+        fields.append(f)
+    return pa.schema(fields, metadata=schema.metadata)
+
+
+def write_parquet_chunks(
+    chunks: Iterable[pd.DataFrame],
+    path: Path,
+    *,
+    schema: pa.Schema | None = None,
+) -> int:
+    """
+    Write a stream of DataFrames to a single parquet file, one chunk at a time
+    
+    Every chunk is cast to schema, by default the first chunk's schema. A
+    column that is all-NA in the first chunk only gets its real type there if
+    its dtype is pinned (see iter_orders_csv) or schema is passed; untyped
+    all-NA columns (object, empty categoricals) are written as string.
+    
+    Args:
+        chunks: DataFrames with the same columns
+        path: Path where to save parquet file
+        schema: Arrow schema of the file (first chunk's schema when None)
+        
+    Returns:
+        Total number of rows written
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    writer = None
+    n_rows = 0
+    try:
+        for chunk in chunks:
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(path, schema or _chunk_schema(table.schema))
+            if table.schema != writer.schema:
+                table = table.cast(writer.schema)
+            writer.write_table(table)
+            n_rows += len(chunk)
+    finally:
+        if writer is not None:
+            writer.close()
+    return n_rows
+
+
+def _record_batches(
+    chunks: Iterable[pd.DataFrame],
+    schema: pa.Schema | None = None,
+) -> tuple[Iterator[pa.RecordBatch], pa.Schema | None]:
+    """Record batches of a chunk stream cast to schema (default: first chunk's, see _chunk_schema; None when empty)."""
+    it = iter(chunks)
+    first = next(it, None)
+    if first is None:
+        return iter(()), None
+    schema = schema or _chunk_schema(pa.Schema.from_pandas(first, preserve_index=False))
+
+    def batches():
+        for chunk in itertools.chain([first], it):
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if table.schema != schema:
+                table = table.cast(schema)
+            yield from table.to_batches()
+
+    return batches(), schema
+
+
+def write_parquet_partitioned(
+    df: pd.DataFrame | Iterable[pd.DataFrame],
+    root: Path,
+    partition_cols: tuple[str, ...] | list[str] = ("year", "month"),
+    *,
+    overwrite: bool = False,
+    row_group_size: int | None = None,
+    compression: str = "snappy",
+    schema: pa.Schema | None = None,
+) -> None:
+    """
+    Write DataFrame as a Hive-partitioned parquet dataset (root/year=2025/month=2025-03/...)
+    
+    By default only partitions present in df are replaced; other partitions
+    under root are left untouched, so a targeted rebuild can rewrite just the
+    affected months. A full rebuild passes overwrite=True so that partitions
+    no longer in the data (e.g. a month whose orders were all removed) do not
+    linger and get read back.
+    df may also be a stream of DataFrames (e.g. joined order chunks); they are
+    written batch by batch with one schema (as in write_parquet_chunks), so
+    the full table never has to fit in memory.
+    
+    Args:
+        df: DataFrame, or iterable of DataFrames with the same columns,
+            to write (must contain partition_cols)
+        root: Dataset directory
+        partition_cols: Columns to partition by, outermost first
+            (e.g. ("year", "month", "country"))
+        overwrite: Delete everything under root first (full rebuild)
+        row_group_size: Maximum rows per row group (pyarrow default when None)
+        compression: Parquet codec ("snappy", "zstd", "gzip", "none", ...)
+        schema: Arrow schema for a stream of DataFrames (first chunk's
+            schema when None)
+        
+    Returns:
+        None
+    """
+    if overwrite and root.exists():
+        shutil.rmtree(root)
+    root.mkdir(parents=True, exist_ok=True)
+    if isinstance(df, pd.DataFrame):
+        data, schema = pa.Table.from_pandas(df, preserve_index=False), None
+    else:
+        data, schema = _record_batches(df, schema)
+        if schema is None:
+            return
+    file_format = ds.ParquetFileFormat()
+    write_kwargs = {}
+    if row_group_size is not None:
+        write_kwargs["max_rows_per_group"] = row_group_size
+    ds.write_dataset(
+        data,
+        root,
+        schema=schema,
+        format=file_format,
+        file_options=file_format.make_write_options(compression=compression),
+        partitioning=list(partition_cols),
+        partitioning_flavor="hive",
+        existing_data_behavior="delete_matching",
+        **write_kwargs,
+    )
+
+
+def read_parquet(
+    path: str | Path,
+    *,
+    columns: list[str] | None = None,
+    filters: list[tuple] | list[list[tuple]] | None = None,
+) -> pd.DataFrame:
     """
     Read DataFrame from parquet file
     
+    Only the requested columns are decoded, and filters are pushed down to
+    row-group statistics so row groups that cannot match are skipped.
+    
     Args:
-        path: Path to parquet file
+        path: Path to parquet file (or partitioned dataset directory)
+        columns: Columns to read (all when None)
+        filters: Row filters in pyarrow DNF form, e.g.
+            [("country", "in", ["SA", "AE"]),
+             ("created_at", ">=", pd.Timestamp("2025-03-01", tz="UTC"))]
         
     Returns:
         DataFrame with data from parquet file
     """
-    return pd.read_parquet(path)
+    kwargs = {}
+    if Path(path).is_dir():
+        # Partition keys as plain typed columns (not dictionaries), so the
+        # null partition written for missing keys reads back cleanly
+        kwargs["partitioning"] = ds.HivePartitioning.discover(infer_dictionary=False)
+    return pd.read_parquet(path, columns=columns, filters=filters, **kwargs)
+
+
+def iter_parquet(
+    path: str | Path,
+    *,
+    columns: list[str] | None = None,
+    batch_size: int = 65_536,
+) -> Iterator[pd.DataFrame]:
+    """
+    Stream a parquet file (or partitioned dataset directory) as DataFrame chunks
+    
+    Args:
+        path: Path to parquet file or dataset directory
+        columns: Columns to read (all when None)
+        batch_size: Maximum rows per chunk
+        
+    Returns:
+        Iterator of DataFrames
+    """
+    if Path(path).is_dir():
+        dataset = ds.dataset(
+            path,
+            format="parquet",
+            partitioning=ds.HivePartitioning.discover(infer_dictionary=False),
+        )
+        batches = dataset.to_batches(columns=columns, batch_size=batch_size)
+    else:
+        batches = pq.ParquetFile(path).iter_batches(batch_size=batch_size, columns=columns)
+    for batch in batches:
+        yield batch.to_pandas()
@@ -2,12 +2,81 @@
 Join/merge helper functions for safe and consistent data operations
 """
 
+from collections.abc import Iterable, Iterator
+
+import numpy as np
 import pandas as pd
 
 
+class DimensionIndex:
+    """
+    Dimension table (e.g. users) indexed once by its key for repeated left joins
+    
+    The key -> row position hash table is built and checked for uniqueness
+    when the index is created; each join is then a hash lookup plus a take
+    per column, so enriching many order batches never re-hashes the table.
+    """
+
+    def __init__(self, right: pd.DataFrame, on: str):
+        """
+        Build the index
+        
+        Args:
+            right: Dimension DataFrame
+            on: Key column, unique in right
+            
+        Raises:
+            ValueError: If the key is not unique
+        """
+        index = pd.Index(right[on])
+        if not index.is_unique:
+            n_dup = int(index.duplicated().sum())
+            raise ValueError(f"{on} not unique in dimension table; {n_dup} duplicate keys")
+        self.on = on
+        self.index = index
+        self.values = right.drop(columns=on).reset_index(drop=True)
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def lookup(self, keys) -> np.ndarray:
+        """
+        Row positions for keys (-1 where the key is not in the table)
+        
+        Args:
+            keys: Array-like of keys
+            
+        Returns:
+            Integer array of positions
+        """
+        return self.index.get_indexer(keys)
+
+    def join(
+        self,
+        left: pd.DataFrame,
+        suffixes: tuple[str, str] = ("_x", "_y"),
+    ) -> pd.DataFrame:
+        """
+        Left join left onto the dimension table (same result as merge how="left")
+        
+        Args:
+            left: Fact DataFrame with the key column
+            suffixes: Suffixes for overlapping column names (left, right)
+            
+        Returns:
+            Joined DataFrame with a fresh RangeIndex
+        """
+        pos = self.lookup(left[self.on])
+        overlap = set(left.columns).intersection(self.values.columns)
+        cols = {(c + suffixes[0] if c in overlap else c): s.array.copy() for c, s in left.items()}
+        for c, s in self.values.items():
+            cols[c + suffixes[1] if c in overlap else c] = s.array.take(pos, allow_fill=True)
+        return pd.DataFrame(cols, index=pd.RangeIndex(len(left)), copy=False)
+
+
 def safe_left_join(
     left: pd.DataFrame,
-    right: pd.DataFrame,
+    right: "pd.DataFrame | DimensionIndex",
     on: str | list[str],
     how: str = "left",
     validate: str | None = None,
@@ -17,7 +86,8 @@ def safe_left_join(
     
     Args:
         left: Left DataFrame
-        right: Right DataFrame
+        right: Right DataFrame, or a prebuilt DimensionIndex (left joins only;
+            its key is already known to be unique, so "m:1" holds)
         on: Column name or list of column names to join on
         how: Type of join ("left", "inner", "outer", "right")
         validate: Validation mode ("1:1", "1:m", "m:1", "m:m")
@@ -28,5 +98,37 @@ def safe_left_join(
     Raises:
         ValueError: If validation fails
     """
+    if isinstance(right, DimensionIndex):
+        if how != "left" or on != right.on or validate not in (None, "m:1", "many_to_one"):
+            raise ValueError("DimensionIndex supports only m:1 left joins on its own key")
+        return right.join(left)
     result = left.merge(right, on=on, how=how, validate=validate)
     return result
+
+
+def join_chunks(
+    chunks: Iterable[pd.DataFrame],
+    right: "pd.DataFrame | DimensionIndex",
+    on: str,
+) -> Iterator[pd.DataFrame]:
+    """
+    Streaming m:1 left join: broadcast a small dimension table to fact chunks
+    
+    The dimension is indexed (and its key validated) once; each chunk is then
+    joined and yielded on its own, so the fact table never has to fit in
+    memory (e.g. iter_parquet -> join_chunks -> write_parquet_partitioned).
+    
+    Args:
+        chunks: Fact DataFrames containing on
+        right: Dimension DataFrame or a prebuilt DimensionIndex on on
+        on: Join key column
+        
+    Returns:
+        Iterator of joined DataFrames, one per chunk
+        
+    Raises:
+        ValueError: If the key is not unique in right
+    """
+    index = right if isinstance(right, DimensionIndex) else DimensionIndex(right, on)
+    for chunk in chunks:
+        yield safe_left_join(chunk, index, on=on, how="left", validate="m:1")
@@ -0,0 +1,233 @@
+"""
+Declarative pipeline DAG: stages declare inputs/outputs, run concurrently, skip when up to date
+"""
+
+import hashlib
+import json
+import logging
+import time
+from collections.abc import Callable
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import pandas as pd
+
+from bootcamp_data.cache import StageCache, file_fingerprint, function_fingerprint
+
+log = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Stage:
+    """
+    One pipeline step: fn(*inputs, **kwargs)
+
+    Inputs are names of other stages (their results are passed in) or file
+    paths. A stage either returns a DataFrame, which is cached and handed to
+    the stages that consume it, or returns None and writes files, which it
+    lists in outputs. Stages reading a file another stage writes depend on
+    it automatically; after adds ordering-only dependencies (e.g. write
+    only once validate has passed).
+    """
+
+    name: str
+    fn: Callable
+    inputs: tuple = ()
+    outputs: tuple[Path, ...] = ()
+    kwargs: dict = field(default_factory=dict)
+    after: tuple[str, ...] = ()
+    version: str = ""
+
+
+class Pipeline:
+    """
+    Run a DAG of stages on a thread or process pool, skipping up-to-date ones
+
+    A stage's key hashes its function (name, source, version, and the source
+    of its module and the project modules that imports), its kwargs and
+    its inputs: the keys of upstream stages and the size/mtime fingerprints
+    of input files (or directories). DataFrame results are stored in a
+    StageCache under that key; for file-writing stages the key and the
+    fingerprints of their outputs are recorded in a state file. A stage whose
+    key (and outputs) are unchanged is skipped, and a cached result is only
+    read back when a stage that consumes it has to run.
+    """
+
+    def __init__(self, stages: list[Stage], cache: StageCache, *, state_path: Path | None = None):
+        self.stages = {s.name: s for s in stages}
+        if len(self.stages) != len(stages):
+            raise ValueError("Stage names must be unique")
+        self.cache = cache
+        self.state_path = state_path or cache.root / "pipeline_state.json"
+        writers = {Path(o): s.name for s in stages for o in s.outputs}
+        self.deps: dict[str, set[str]] = {}
+        for s in stages:
+            deps = set(s.after)
+            for x in s.inputs:
+                if isinstance(x, Path):
+                    if x in writers:
+                        deps.add(writers[x])
+                elif x in self.stages:
+                    deps.add(x)
+                else:
+                    raise ValueError(f"Stage {s.name}: unknown input {x!r}")
+            unknown = deps - self.stages.keys()
+            if unknown:
+                raise ValueError(f"Stage {s.name}: unknown dependencies {sorted(unknown)}")
+            self.deps[s.name] = deps
+        self.order = self._toposort()
+
+    def _toposort(self) -> list[str]:
+        order, done, visiting = [], set(), set()
+
+        def visit(name):
+            if name in done:
+                return
+            if name in visiting:
+                raise ValueError(f"Cycle in pipeline at stage {name}")
+            visiting.add(name)
+            for d in sorted(self.deps[name]):
+                visit(d)
+            visiting.discard(name)
+            done.add(name)
+            order.append(name)
+
+        for name in self.stages:
+            visit(name)
+        return order
+
+    def _needed(self, targets: list[str] | None) -> list[str]:
+        if targets is None:
+            return self.order
+        needed, todo = set(), list(targets)
+        while todo:
+            name = todo.pop()
+            if name not in self.stages:
+                raise ValueError(f"Unknown stage: {name}")
+            if name not in needed:
+                needed.add(name)
+                todo += self.deps[name]
+        return [n for n in self.order if n in needed]
+
+    def _key(self, stage: Stage, keys: dict[str, str]) -> str:
+        h = hashlib.sha256(function_fingerprint(stage.fn, stage.version).encode())
+        for x in stage.inputs:
+            token = file_fingerprint(x) if isinstance(x, Path) else f"stage:{keys[x]}"
+            h.update(b"\0" + token.encode())
+        for name in sorted(stage.kwargs):
+            h.update(f"\0{name}={stage.kwargs[name]!r}".encode())
+        for name in sorted(stage.after):
+            h.update(f"\0after:{keys[name]}".encode())
+        for o in stage.outputs:
+            h.update(f"\0output:{o}".encode())
+        return h.hexdigest()
+
+    def _load_state(self) -> dict:
+        try:
+            return json.loads(self.state_path.read_text())
+        except (OSError, ValueError):
+            return {}
+
+    def _up_to_date(self, stage: Stage, key: str, state: dict) -> bool:
+        if stage.outputs or stage.name in state:
+            entry = state.get(stage.name)
+            return (
+                entry is not None
+                and entry["key"] == key
+                and all(Path(o).exists() for o in stage.outputs)
+                and entry["outputs"] == [file_fingerprint(Path(o)) for o in stage.outputs]
+            )
+        return self.cache.path(key).exists()
+
+    def run(
+        self,
+        targets: list[str] | None = None,
+        *,
+        max_workers: int = 4,
+        executor: str = "thread",
+        force: bool = False,
+    ) -> dict[str, str]:
+        """
+        Run the stages needed for targets, independent ones concurrently
+
+        Args:
+            targets: Stages to bring up to date, with their upstream stages
+                (all stages when None)
+            max_workers: Pool size
+            executor: "thread" or "process" (stage functions and their
+                inputs must then be picklable)
+            force: Re-run every stage even when it is up to date
+
+        Returns:
+            Stage name -> "ran" or "skipped", in completion order
+
+        Raises:
+            Exception: The first exception raised by a stage
+        """
+        names = self._needed(targets)
+        pool_cls = {"thread": ThreadPoolExecutor, "process": ProcessPoolExecutor}[executor]
+        state = self._load_state()
+        keys: dict[str, str] = {}
+        results: dict[str, pd.DataFrame] = {}
+        status: dict[str, str] = {}
+        waiting = {n: set(self.deps[n]) for n in names}
+        consumers = {n: sum(n in self.stages[m].inputs for m in names) for n in names}
+        running = {}
+
+        def result_of(name: str) -> pd.DataFrame:
+            if name not in results:
+                results[name] = self.cache.get(keys[name])
+            return results[name]
+
+        def release(stage: Stage) -> None:
+            # Drop upstream results no remaining stage will read
+            for x in stage.inputs:
+                if not isinstance(x, Path):
+                    consumers[x] -= 1
+                    if consumers[x] == 0:
+                        results.pop(x, None)
+
+        def finish(name: str, how: str) -> None:
+            status[name] = how
+            for n, deps in waiting.items():
+                deps.discard(name)
+
+        with pool_cls(max_workers=max_workers) as pool:
+            try:
+                while waiting or running:
+                    for name in [n for n, deps in waiting.items() if not deps]:
+                        del waiting[name]
+                        stage = self.stages[name]
+                        keys[name] = self._key(stage, keys)
+                        if not force and self._up_to_date(stage, keys[name], state):
+                            log.info("Stage %s: up to date", name)
+                            release(stage)
+                            finish(name, "skipped")
+                            continue
+                        log.info("Stage %s: running", name)
+                        args = [x if isinstance(x, Path) else result_of(x) for x in stage.inputs]
+                        running[pool.submit(stage.fn, *args, **stage.kwargs)] = (name, time.perf_counter())
+                    if not running:
+                        continue
+                    done, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        name, t0 = running.pop(future)
+                        stage = self.stages[name]
+                        result = future.result()
+                        if isinstance(result, pd.DataFrame):
+                            results[name] = self.cache.put(keys[name], result)
+                        else:
+                            state[name] = {
+                                "key": keys[name],
+                                "outputs": [file_fingerprint(Path(o)) for o in stage.outputs],
+                            }
+                        log.info("Stage %s: done in %.2fs", name, time.perf_counter() - t0)
+                        release(stage)
+                        finish(name, "ran")
+            finally:
+                for future in running:
+                    future.cancel()
+                self.state_path.parent.mkdir(parents=True, exist_ok=True)
+                self.state_path.write_text(json.dumps(state, indent=2))
+        return status
@@ -0,0 +1,313 @@
+"""
+Mergeable data-quality profiles for chunked or partitioned tables
+"""
+from __future__ import annotations
+
+from collections.abc import Iterable
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from bootcamp_data.io import iter_parquet
+from bootcamp_data.sketches import HyperLogLog, QuantileSketch
+
+
+class ColumnProfile:
+    """
+    Running statistics of one column: nulls, distinct count, min/max, histogram
+
+    Numeric columns keep a QuantileSketch for their value histogram; other
+    columns keep exact value counts until they exceed max_values distinct
+    values (ids, free text), after which only the distinct count is kept.
+    """
+
+    def __init__(self, dtype: str, *, p: int = 12, k: int = 200, max_values: int = 50):
+        self.dtype = dtype
+        self.max_values = max_values
+        self.n = 0
+        self.n_missing = 0
+        self.distinct = HyperLogLog(p)
+        self.min = None
+        self.max = None
+        self.numeric = dtype != "bool" and pd.api.types.is_numeric_dtype(pd.Series(dtype=dtype))
+        self.quantiles = QuantileSketch(k) if self.numeric else None
+        self.counts: pd.Series | None = None if self.numeric else pd.Series(dtype="int64")
+
+    def update(self, s: pd.Series) -> ColumnProfile:
+        """
+        Add one chunk of the column
+
+        Args:
+            s: Column values
+
+        Returns:
+            self
+        """
+        na = s.isna().to_numpy()
+        self.n += len(s)
+        self.n_missing += int(na.sum())
+        x = s[~na]
+        if len(x) == 0:
+            return self
+        self.distinct.update(x)
+        if self.numeric or pd.api.types.is_datetime64_any_dtype(x):
+            self._extend(x.min(), x.max())
+        if self.quantiles is not None:
+            self.quantiles.update(x)
+        if self.counts is not None:
+            self._add_counts(x.value_counts(sort=False))
+        return self
+
+    def _extend(self, lo, hi) -> None:
+        self.min = lo if self.min is None or (lo is not None and lo < self.min) else self.min
+        self.max = hi if self.max is None or (hi is not None and hi > self.max) else self.max
+
+    def _add_counts(self, counts: pd.Series) -> None:
+        counts = counts[counts > 0]
+        counts.index = counts.index.astype(object)
+        self.counts = self.counts.add(counts, fill_value=0).astype("int64")
+        if len(self.counts) > self.max_values:
+            self.counts = None  # too many distinct values to be useful
+
+    def merge(self, other: ColumnProfile) -> ColumnProfile:
+        """
+        Fold another profile of the same column into this one
+
+        Args:
+            other: Profile built with the same settings
+
+        Returns:
+            self
+        """
+        self.n += other.n
+        self.n_missing += other.n_missing
+        self.distinct.merge(other.distinct)
+        if other.min is not None:
+            self._extend(other.min, other.max)
+        if self.quantiles is not None and other.quantiles is not None:
+            self.quantiles.merge(other.quantiles)
+        if self.counts is not None:
+            if other.counts is None:
+                self.counts = None
+            else:
+                self._add_counts(other.counts)
+        return self
+
+    def histogram(self, bins: int = 10) -> pd.DataFrame:
+        """
+        Value histogram: equal-width bins (numeric) or value counts (others)
+
+        Args:
+            bins: Number of bins for numeric columns
+
+        Returns:
+            DataFrame with value (or bin lo/hi) and count columns;
+            empty when the column has too many distinct values
+        """
+        if self.quantiles is not None:
+            if self.quantiles.n == 0:
+                return pd.DataFrame(columns=["lo", "hi", "count"])
+            edges = np.linspace(self.quantiles.min, self.quantiles.max, bins + 1)
+            cdf = np.concatenate([[0.0], self.quantiles.rank(edges[1:])])
+            counts = np.round(np.diff(cdf) * self.quantiles.n).astype("int64")
+            return pd.DataFrame({"lo": edges[:-1], "hi": edges[1:], "count": counts})
+        if self.counts is None:
+            return pd.DataFrame(columns=["value", "count"])
+        top = self.counts.sort_values(ascending=False, kind="stable")
+        return top.rename_axis("value").rename("count").reset_index()
+
+
+class TableProfile:
+    """
+    Mergeable profile of a table, built chunk by chunk
+
+    Feed chunks (or partitions) with update; profiles built on different
+    workers over disjoint rows combine with merge. Memory per column is
+    fixed (sketches plus at most max_values counts), so multi-GB extracts
+    can be profiled without loading them.
+    """
+
+    def __init__(self, *, p: int = 12, k: int = 200, max_values: int = 50):
+        self.p = p
+        self.k = k
+        self.max_values = max_values
+        self.n_rows = 0
+        self.columns: dict[str, ColumnProfile] = {}
+
+    def _column(self, name: str, dtype) -> ColumnProfile:
+        if name not in self.columns:
+            self.columns[name] = ColumnProfile(str(dtype), p=self.p, k=self.k, max_values=self.max_values)
+        return self.columns[name]
+
+    def update(self, df: pd.DataFrame) -> TableProfile:
+        """
+        Add one chunk of rows
+
+        Args:
+            df: DataFrame chunk
+
+        Returns:
+            self
+        """
+        self.n_rows += len(df)
+        for name, s in df.items():
+            self._column(name, s.dtype).update(s)
+        return self
+
+    def merge(self, other: TableProfile) -> TableProfile:
+        """
+        Fold a profile of other rows of the same table into this one
+
+        Args:
+            other: TableProfile built with the same settings
+
+        Returns:
+            self
+        """
+        self.n_rows += other.n_rows
+        for name, col in other.columns.items():
+            self._column(name, col.dtype).merge(col)
+        return self
+
+    def missingness(self) -> pd.DataFrame:
+        """
+        Missingness report (same layout as transforms.missingness_report)
+
+        Returns:
+            DataFrame with n_missing and p_missing columns, sorted by p_missing
+        """
+        return (
+            pd.Series({name: col.n_missing for name, col in self.columns.items()}, dtype="int64")
+            .rename("n_missing")
+            .to_frame()
+            .assign(p_missing=lambda t: t["n_missing"] / self.n_rows)
+            .sort_values("p_missing", ascending=False)
+        )
+
+    def summary(self) -> pd.DataFrame:
+        """
+        One row per column: dtype, missing values, approximate distinct count, min, max
+
+        Returns:
+            DataFrame indexed by column name
+        """
+        return pd.DataFrame.from_dict(
+            {
+                name: {
+                    "dtype": col.dtype,
+                    "n_missing": col.n_missing,
+                    "p_missing": col.n_missing / self.n_rows if self.n_rows else np.nan,
+                    "n_distinct": round(col.distinct.count()),
+                    "min": col.min,
+                    "max": col.max,
+                }
+                for name, col in self.columns.items()
+            },
+            orient="index",
+        )
+
+
+def profile_chunks(chunks: Iterable[pd.DataFrame], **kwargs) -> TableProfile:
+    """
+    Profile a chunk stream (e.g. iter_orders_csv)
+
+    Args:
+        chunks: DataFrames of the same table
+        **kwargs: TableProfile settings (p, k, max_values)
+
+    Returns:
+        TableProfile
+    """
+    profile = TableProfile(**kwargs)
+    for chunk in chunks:
+        profile.update(chunk)
+    return profile
+
+
+def profile_parquet(
+    path: str | Path,
+    *,
+    columns: list[str] | None = None,
+    batch_size: int = 65_536,
+    **kwargs,
+) -> TableProfile:
+    """
+    Profile a parquet file or dataset directory batch by batch
+
+    Args:
+        path: Parquet file or partitioned dataset directory
+        columns: Columns to profile (all when None)
+        batch_size: Rows per decoded batch
+        **kwargs: TableProfile settings (p, k, max_values)
+
+    Returns:
+        TableProfile
+    """
+    return profile_chunks(iter_parquet(path, columns=columns, batch_size=batch_size), **kwargs)
+
+
+def _md_table(df: pd.DataFrame) -> list[str]:
+    lines = ["| " + " | ".join(map(str, df.columns)) + " |", "|" + "---|" * len(df.columns)]
+    for row in df.itertuples(index=False):
+        lines.append("| " + " | ".join("" if pd.isna(v) else str(v) for v in row) + " |")
+    return lines
+
+
+def write_profile_reports(profile: TableProfile, reports_dir: Path, name: str) -> tuple[Path, Path]:
+    """
+    Write reports/missingness_{name}.csv (missingness table) and .md (full profile)
+
+    Args:
+        profile: TableProfile of the table
+        reports_dir: Output directory
+        name: Table name used in the file names (e.g. "orders")
+
+    Returns:
+        Tuple of (csv_path, md_path)
+    """
+    reports_dir.mkdir(parents=True, exist_ok=True)
+    csv_path = reports_dir / f"missingness_{name}.csv"
+    md_path = reports_dir / f"missingness_{name}.md"
+    profile.missingness().to_csv(csv_path, index=True)
+
+    summary = profile.summary()
+    miss = profile.missingness()
+    lines = [
+        "# Data Missingness Report",
+        "",
+        f"**Report Date:** {datetime.now():%Y-%m-%d %H:%M:%S}",
+        "",
+        "## Summary",
+        f"- **Rows:** {profile.n_rows}",
+        f"- **Columns:** {len(profile.columns)}",
+        f"- **Columns with missing values:** {int((miss['n_missing'] > 0).sum())}",
+        "",
+        "## Missing Values Analysis",
+        "",
+        *_md_table(pd.DataFrame({
+            "Column": miss.index,
+            "Missing": miss["n_missing"].to_numpy(),
+            "% Missing": (miss["p_missing"] * 100).round(2).to_numpy(),
+        })),
+        "",
+        "## Column Profile",
+        "",
+        *_md_table(pd.DataFrame({
+            "Column": summary.index,
+            "Type": summary["dtype"].to_numpy(),
+            "Distinct (approx.)": summary["n_distinct"].to_numpy(),
+            "Min": summary["min"].to_numpy(),
+            "Max": summary["max"].to_numpy(),
+        })),
+    ]
+    lines += ["", "## Value Histograms"]
+    for col_name, col in profile.columns.items():
+        hist = col.histogram()
+        if len(hist):
+            if "lo" in hist:
+                hist = hist.assign(lo=hist["lo"].round(2), hi=hist["hi"].round(2))
+            lines += ["", f"### {col_name}", "", *_md_table(hist)]
+    md_path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return csv_path, md_path
@@ -2,7 +2,13 @@
 Lightweight data quality checks using assertions
 """
 
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import numpy as np
 import pandas as pd
+import pyarrow.parquet as pq
 
 
 def require_columns(df: pd.DataFrame, cols: list[str]) -> None:
@@ -70,3 +76,475 @@ def assert_in_range(s: pd.Series, lo=None, hi=None, name: str = "value") -> None
         assert (x >= lo).all(), f"{name} below {lo}"
     if hi is not None:
         assert (x <= hi).all(), f"{name} above {hi}"
+
+
+# ============================================================================
+# SAMPLED CHECKS: validate a reproducible sample, escalate to a full scan
+# ============================================================================
+
+def sample_rows(df: pd.DataFrame, n: int, *, seed: int = 0, by: str | None = None) -> pd.DataFrame:
+    """
+    Reproducible random (or stratified) sample of about n rows, in original order
+    
+    Args:
+        df: DataFrame to sample
+        n: Target sample size
+        seed: Random seed
+        by: Optional column to stratify by; each group (NA included) gets a
+            proportional share and at least one row
+        
+    Returns:
+        Sampled rows (df itself when it has at most n rows)
+    """
+    if len(df) <= n:
+        return df
+    r = np.random.default_rng(seed).random(len(df))
+    if by is None:
+        pos = np.sort(np.argpartition(r, n)[:n])
+    else:
+        groups = df[by].set_axis(range(len(df)))
+        rank = pd.Series(r).groupby(groups, dropna=False, observed=True).rank(method="first")
+        quota = np.ceil(groups.groupby(groups, dropna=False, observed=True).transform("size") * (n / len(df)))
+        pos = np.flatnonzero((rank <= quota.clip(lower=1)).to_numpy())
+    return df.iloc[pos]
+
+
+def sampled_check(
+    df: pd.DataFrame,
+    check: Callable[[pd.DataFrame], None],
+    *,
+    n: int = 10_000,
+    seed: int = 0,
+    by: str | None = None,
+    strict: bool = False,
+    confidence: float = 0.95,
+    name: str = "check",
+) -> str:
+    """
+    Run a check on a sample first; scan every row only when needed
+    
+    The check runs on a reproducible sample (see sample_rows). It is re-run
+    on the full frame when the sample fails (so the error reports the full
+    picture) or when strict=True. A clean sample of m rows means that, with
+    the given confidence, fewer than 1 - (1 - confidence)**(1/m) of the rows
+    violate a row-wise rule such as assert_in_range (about 3/m at 95%).
+    Duplicates found in a sample are real, but a clean sample says little
+    about uniqueness; use strict=True when it matters.
+    
+    Args:
+        df: DataFrame to check
+        check: Function raising AssertionError on failure, e.g.
+            lambda d: assert_in_range(d["amount"], lo=0) or
+            lambda d: rules.validate(d).raise_if_failed()
+        n: Sample size
+        seed: Random seed
+        by: Optional column to stratify the sample by
+        strict: Always finish with a full scan
+        confidence: Confidence level of the statement
+        name: Name for the statement
+        
+    Returns:
+        Statement of what was checked (and at what confidence)
+        
+    Raises:
+        AssertionError: If the check fails on the full frame
+    """
+    sample = sample_rows(df, n, seed=seed, by=by)
+    if len(sample) == len(df):
+        check(df)
+        return f"{name}: passed on all {len(df)} rows"
+    try:
+        check(sample)
+    except AssertionError:
+        check(df)  # escalate: raises with full-data counts if the violation is real
+        return f"{name}: sample of {len(sample)} rows failed, but passed on all {len(df)} rows"
+    if strict:
+        check(df)
+        return f"{name}: passed on all {len(df)} rows (strict)"
+    bound = 1 - (1 - confidence) ** (1 / len(sample))
+    return (
+        f"{name}: passed on a {len(sample)}-row sample of {len(df)} rows; "
+        f"with {confidence:.0%} confidence fewer than {bound:.3%} of rows violate it"
+    )
+
+
+# ============================================================================
+# PARQUET METADATA CHECKS: answered from footer statistics where conclusive
+# ============================================================================
+
+def _parquet_files(path: str | Path) -> list[Path]:
+    path = Path(path)
+    return sorted(path.rglob("*.parquet")) if path.is_dir() else [path]
+
+
+def parquet_column_stats(path: str | Path, col: str) -> pd.DataFrame:
+    """
+    Per-row-group footer statistics of one column (no data pages are read)
+    
+    Args:
+        path: Parquet file or dataset directory
+        col: Column name
+        
+    Returns:
+        DataFrame with file, row_group, num_rows, null_count, min, max
+        (None where the writer stored no statistics)
+        
+    Raises:
+        AssertionError: If a file has no such column
+    """
+    rows = _column_stats(path, col)
+    return pd.DataFrame(rows, columns=["file", "row_group", "num_rows", "null_count", "min", "max"])
+
+
+def _column_stats(path: str | Path, col: str) -> list[dict]:
+    # Plain records: in a DataFrame a missing statistic (None) next to stored
+    # ones becomes NaN, which the checks below would compare instead of decode
+    rows = []
+    for f in _parquet_files(path):
+        md = pq.ParquetFile(f).metadata
+        names = [md.schema.column(i).path for i in range(md.num_columns)]
+        assert col in names, f"Missing columns: {[col]} in {f}"
+        i = names.index(col)
+        for rg in range(md.num_row_groups):
+            st = md.row_group(rg).column(i).statistics
+            has_min_max = st is not None and st.has_min_max
+            rows.append({
+                "file": f,
+                "row_group": rg,
+                "num_rows": md.row_group(rg).num_rows,
+                "null_count": st.null_count if st is not None and st.has_null_count else None,
+                "min": st.min if has_min_max else None,
+                "max": st.max if has_min_max else None,
+            })
+    return rows
+
+
+def _read_row_group(f: Path, rg: int, col: str) -> pd.Series:
+    return pq.ParquetFile(f).read_row_group(rg, columns=[col]).column(0).to_pandas()
+
+
+def assert_parquet_non_empty(path: str | Path, name: str = "df") -> None:
+    """
+    Assert that a parquet file or dataset has rows, from footer row counts
+    
+    Args:
+        path: Parquet file or dataset directory
+        name: Name for error message
+        
+    Raises:
+        AssertionError: If it has 0 rows
+    """
+    n = sum(pq.ParquetFile(f).metadata.num_rows for f in _parquet_files(path))
+    assert n > 0, f"{name} has 0 rows"
+
+
+def assert_parquet_no_nulls(path: str | Path, cols: list[str]) -> None:
+    """
+    Assert that parquet columns have no nulls, from footer null counts
+    
+    Row groups without a stored null count are decoded and checked.
+    
+    Args:
+        path: Parquet file or dataset directory
+        cols: Columns that must not contain nulls
+        
+    Raises:
+        AssertionError: If any column contains nulls
+    """
+    for col in cols:
+        n_null = 0
+        for r in _column_stats(path, col):
+            if r["null_count"] is None:
+                n_null += int(_read_row_group(r["file"], r["row_group"], col).isna().sum())
+            else:
+                n_null += r["null_count"]
+        assert n_null == 0, f"{col} contains NA; {n_null} rows"
+
+
+def assert_parquet_in_range(path: str | Path, col: str, lo=None, hi=None, name: str | None = None) -> None:
+    """
+    Assert that non-null values of a parquet column are within range
+    
+    A row group passes from its footer min/max when they lie inside
+    [lo, hi] and fails when they lie outside (a min/max is an actual value);
+    only row groups without statistics are decoded, and checked with
+    assert_in_range.
+    
+    Args:
+        path: Parquet file or dataset directory
+        col: Column name
+        lo: Minimum value (inclusive)
+        hi: Maximum value (inclusive)
+        name: Name for error message (defaults to col)
+        
+    Raises:
+        AssertionError: If values are outside range
+    """
+    name = name or col
+    for r in _column_stats(path, col):
+        if r["null_count"] == r["num_rows"]:
+            continue  # all null
+        if r["min"] is None:
+            assert_in_range(_read_row_group(r["file"], r["row_group"], col), lo, hi, name)
+            continue
+        if lo is not None:
+            assert r["min"] >= lo, f"{name} below {lo}"
+        if hi is not None:
+            assert r["max"] <= hi, f"{name} above {hi}"
+
+
+# ============================================================================
+# RULE SETS: declare checks once, validate in one pass (whole frame or chunks)
+# ============================================================================
+
+@dataclass(frozen=True)
+class Violation:
+    """One failed rule: how many rows broke it and a few of their index labels."""
+
+    rule: str
+    column: str | None
+    message: str
+    count: int
+    sample: list = field(default_factory=list)
+
+
+@dataclass
+class ValidationReport:
+    """
+    Every violation found by a RuleSet (nothing is raised while collecting)
+    """
+
+    name: str
+    n_rows: int
+    violations: list[Violation]
+
+    @property
+    def ok(self) -> bool:
+        return not self.violations
+
+    def to_frame(self) -> pd.DataFrame:
+        """
+        Violations as a table (one row per failed rule)
+        
+        Returns:
+            DataFrame with rule, column, message, count, sample
+        """
+        cols = ["rule", "column", "message", "count", "sample"]
+        return pd.DataFrame([[getattr(v, c) for c in cols] for v in self.violations], columns=cols)
+
+    def raise_if_failed(self) -> None:
+        """
+        Raise if any rule failed, listing all violations
+        
+        Raises:
+            AssertionError: If there are violations
+        """
+        assert self.ok, f"{self.name} failed validation: " + "; ".join(
+            f"{v.message} (rows e.g. {v.sample})" if v.sample else v.message
+            for v in self.violations
+        )
+
+
+class _SeenKeys:
+    """Set of 64-bit key hashes kept as sorted runs that merge as they grow."""
+
+    def __init__(self):
+        self._runs: list[np.ndarray] = []
+
+    def seen(self, h: np.ndarray) -> np.ndarray:
+        """Mask of hashes already in the set; then add h (h must be unique)."""
+        mask = np.zeros(len(h), dtype=bool)
+        if len(h) == 0:
+            return mask  # e.g. a chunk whose keys are all NA; an empty run has no last item
+        for run in self._runs:
+            if len(run) == 0:
+                continue
+            pos = np.searchsorted(run, h).clip(max=len(run) - 1)
+            mask |= run[pos] == h
+        self._runs.append(np.sort(h))
+        while len(self._runs) > 1 and len(self._runs[-2]) <= 2 * len(self._runs[-1]):
+            last = self._runs.pop()
+            self._runs[-1] = np.sort(np.concatenate([self._runs[-1], last]))
+        return mask
+
+
+class RuleSet:
+    """
+    Declarative data quality rules for one table, checked in a single pass
+    
+    Rules are declared with chained calls and evaluated together, column by
+    column, on a whole frame (validate) or chunk by chunk (stream); every
+    violation is collected with its row count and sample index labels
+    instead of stopping at the first failure:
+    
+        rules = RuleSet("orders").require_columns(cols).non_empty().in_range("amount", lo=0)
+        rules.validate(orders).raise_if_failed()
+    
+    Uniqueness is tracked across chunks through 64-bit hashes of the keys.
+    """
+
+    def __init__(self, name: str = "df", *, sample_size: int = 5):
+        self.name = name
+        self.sample_size = sample_size
+        self.columns: list[str] = []
+        self.check_non_empty = False
+        self.unique_keys: dict[str, bool] = {}
+        self.ranges: dict[str, list[tuple]] = {}
+
+    def require_columns(self, cols: list[str]) -> "RuleSet":
+        """Columns that must exist (see require_columns)."""
+        self.columns += [c for c in cols if c not in self.columns]
+        return self
+
+    def non_empty(self) -> "RuleSet":
+        """At least one row in total (see assert_non_empty)."""
+        self.check_non_empty = True
+        return self
+
+    def unique_key(self, key: str, *, allow_na: bool = False) -> "RuleSet":
+        """Key column without duplicates (see assert_unique_key); rows repeating an earlier key count."""
+        self.unique_keys[key] = allow_na
+        return self
+
+    def in_range(self, col: str, lo=None, hi=None) -> "RuleSet":
+        """Non-NA values of col within [lo, hi] (see assert_in_range)."""
+        self.ranges.setdefault(col, []).append((lo, hi))
+        return self
+
+    def stream(self) -> "RuleStream":
+        """
+        Start validating a stream of chunks
+        
+        Returns:
+            RuleStream: feed chunks with update(), then call report()
+        """
+        return RuleStream(self)
+
+    def validate(self, df: pd.DataFrame) -> ValidationReport:
+        """
+        Check all rules on one frame
+        
+        Args:
+            df: DataFrame to check
+            
+        Returns:
+            ValidationReport
+        """
+        return self.stream().update(df).report()
+
+    def validate_chunks(self, chunks: Iterable[pd.DataFrame]) -> ValidationReport:
+        """
+        Check all rules over a chunk stream (e.g. iter_orders_csv)
+        
+        Args:
+            chunks: DataFrames of the same table
+            
+        Returns:
+            ValidationReport
+        """
+        stream = self.stream()
+        for chunk in chunks:
+            stream.update(chunk)
+        return stream.report()
+
+
+class RuleStream:
+    """
+    Running validation of a RuleSet over chunks; counts accumulate per rule
+    """
+
+    def __init__(self, rules: RuleSet):
+        self.rules = rules
+        self.n_rows = 0
+        self._counts: dict[tuple, int] = {}
+        self._samples: dict[tuple, list] = {}
+        self._missing: list[str] = []
+        self._seen = {key: _SeenKeys() for key in rules.unique_keys}
+
+    def _add(self, rule: tuple, mask: np.ndarray, index: pd.Index) -> None:
+        n = int(mask.sum())
+        if n == 0:
+            return
+        self._counts[rule] = self._counts.get(rule, 0) + n
+        sample = self._samples.setdefault(rule, [])
+        if len(sample) < self.rules.sample_size:
+            sample += index[mask][: self.rules.sample_size - len(sample)].tolist()
+
+    def update(self, df: pd.DataFrame) -> "RuleStream":
+        """
+        Check one chunk
+        
+        Args:
+            df: Next chunk of the table
+            
+        Returns:
+            self
+        """
+        rules = self.rules
+        self.n_rows += len(df)
+        missing = [c for c in rules.columns if c not in df.columns]
+        self._missing += [c for c in missing if c not in self._missing]
+
+        for key, allow_na in rules.unique_keys.items():
+            if key not in df.columns:
+                continue
+            na = df[key].isna().to_numpy()
+            if not allow_na:
+                self._add(("na", key), na, df.index)
+            # Rows repeating a key seen earlier (in this chunk or a previous one)
+            h = pd.util.hash_pandas_object(df[key], index=False, categorize=False).to_numpy()[~na]
+            first = ~pd.Series(h).duplicated().to_numpy()
+            dup = ~first
+            dup[first] = self._seen[key].seen(h[first])
+            mask = np.zeros(len(df), dtype=bool)
+            mask[~na] = dup
+            self._add(("dup", key), mask, df.index)
+
+        for col, bounds in rules.ranges.items():
+            if col not in df.columns:
+                continue
+            x = df[col]
+            for lo, hi in bounds:
+                if lo is not None:
+                    self._add(("lo", col, lo), (x < lo).fillna(False).to_numpy(dtype=bool), df.index)
+                if hi is not None:
+                    self._add(("hi", col, hi), (x > hi).fillna(False).to_numpy(dtype=bool), df.index)
+        return self
+
+    def report(self) -> ValidationReport:
+        """
+        Violations found so far
+        
+        Returns:
+            ValidationReport
+        """
+        name = self.rules.name
+        violations = []
+        if self._missing:
+            violations.append(Violation(
+                "require_columns", None, f"Missing columns: {self._missing}", len(self._missing)
+            ))
+        if self.rules.check_non_empty and self.n_rows == 0:
+            violations.append(Violation("non_empty", None, f"{name} has 0 rows", 1))
+        declared = [("na", k) for k in self.rules.unique_keys] + [("dup", k) for k in self.rules.unique_keys]
+        declared += [
+            (kind, col, b)
+            for col, bounds in self.rules.ranges.items()
+            for lo, hi in bounds
+            for kind, b in (("lo", lo), ("hi", hi))
+            if b is not None
+        ]
+        for rule in declared:
+            n = self._counts.get(rule, 0)
+            if n == 0:
+                continue
+            kind, col = rule[0], rule[1]
+            if kind == "na":
+                rule_name, message = "unique_key", f"{col} contains NA; {n} rows"
+            elif kind == "dup":
+                rule_name, message = "unique_key", f"{col} not unique; {n} duplicate rows"
+            else:
+                bound = "below" if kind == "lo" else "above"
+                rule_name, message = "in_range", f"{col} {bound} {rule[2]}; {n} rows"
+            violations.append(Violation(rule_name, col, message, n, self._samples[rule]))
+        return ValidationReport(name, self.n_rows, violations)
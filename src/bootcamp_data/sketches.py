@@ -0,0 +1,325 @@
+"""
+Mergeable streaming sketches for out-of-core statistics
+"""
+from __future__ import annotations
+
+from collections.abc import Iterable
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+
+
+class QuantileSketch:
+    """
+    KLL quantile sketch: feed values chunk by chunk, merge sketches, query quantiles
+
+    Memory is O(k) regardless of how many values are added. The rank error of a
+    quantile is roughly 1.7 / k (k=200 -> under 1%; see with_error). Sketches
+    built with the same k can be merged (e.g. one per worker or row group).
+    """
+
+    def __init__(self, k: int = 200, *, seed: int = 0):
+        self.k = k
+        self.n = 0
+        self.min = np.inf
+        self.max = -np.inf
+        self._levels: list[np.ndarray] = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+
+    @classmethod
+    def with_error(cls, eps: float, *, seed: int = 0) -> QuantileSketch:
+        """
+        Sketch sized for a target rank error
+
+        Args:
+            eps: Target rank error (e.g. 0.01 for 1%)
+            seed: Random seed for compaction
+
+        Returns:
+            Empty QuantileSketch
+        """
+        return cls(k=max(8, int(np.ceil(1.7 / eps))), seed=seed)
+
+    def _capacity(self, h: int) -> int:
+        depth = len(self._levels) - 1 - h
+        return max(2, int(np.ceil(self.k * (2 / 3) ** depth)))
+
+    def _compress(self) -> None:
+        h = 0
+        while h < len(self._levels):
+            level = self._levels[h]
+            if len(level) > self._capacity(h):
+                if h + 1 == len(self._levels):
+                    self._levels.append(np.empty(0))
+                level = np.sort(level)
+                # An odd item stays behind so total weight is preserved exactly
+                rest, level = level[: len(level) % 2], level[len(level) % 2 :]
+                promoted = level[self._rng.integers(2) :: 2]
+                self._levels[h] = rest
+                self._levels[h + 1] = np.concatenate([self._levels[h + 1], promoted])
+            h += 1
+
+    def update(self, values) -> QuantileSketch:
+        """
+        Add values (NaN/NA are ignored)
+
+        Args:
+            values: Array-like of numbers
+
+        Returns:
+            self
+        """
+        x = pd.to_numeric(pd.Series(values), errors="coerce").to_numpy(dtype="float64", na_value=np.nan)
+        x = x[~np.isnan(x)]
+        if len(x) == 0:
+            return self
+        self.n += len(x)
+        self.min = min(self.min, x.min())
+        self.max = max(self.max, x.max())
+        self._levels[0] = np.concatenate([self._levels[0], x])
+        self._compress()
+        return self
+
+    def merge(self, other: QuantileSketch) -> QuantileSketch:
+        """
+        Fold another sketch into this one
+
+        Args:
+            other: Sketch built with the same k
+
+        Returns:
+            self
+        """
+        if other.k != self.k:
+            raise ValueError(f"Cannot merge sketches with k={self.k} and k={other.k}")
+        while len(self._levels) < len(other._levels):
+            self._levels.append(np.empty(0))
+        for h, level in enumerate(other._levels):
+            self._levels[h] = np.concatenate([self._levels[h], level])
+        self.n += other.n
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._compress()
+        return self
+
+    def _weighted_items(self) -> tuple[np.ndarray, np.ndarray]:
+        """Retained items, sorted, with their cumulative weights."""
+        items = np.concatenate(self._levels)
+        weights = np.concatenate([np.full(len(lv), 2**h) for h, lv in enumerate(self._levels)])
+        order = np.argsort(items, kind="stable")
+        return items[order], np.cumsum(weights[order])
+
+    def rank(self, x):
+        """
+        Approximate fraction of values <= x (the empirical CDF)
+
+        Args:
+            x: Value or array of values
+
+        Returns:
+            float (or array for array-like x); NaN when the sketch is empty
+        """
+        xs = np.atleast_1d(np.asarray(x, dtype="float64"))
+        if self.n == 0:
+            out = np.full(len(xs), np.nan)
+        else:
+            items, cum = self._weighted_items()
+            idx = np.searchsorted(items, xs, side="right")
+            out = np.where(idx > 0, cum[np.maximum(idx - 1, 0)], 0) / cum[-1]
+            out = np.where(xs >= self.max, 1.0, out)
+        return float(out[0]) if np.ndim(x) == 0 else out
+
+    def quantile(self, q):
+        """
+        Approximate quantile(s)
+
+        Args:
+            q: Probability or array of probabilities in [0, 1]
+
+        Returns:
+            float (or array for array-like q); NaN when the sketch is empty
+        """
+        qs = np.atleast_1d(np.asarray(q, dtype="float64"))
+        if self.n == 0:
+            out = np.full(len(qs), np.nan)
+        else:
+            items, cum = self._weighted_items()
+            idx = np.searchsorted(cum, qs * cum[-1], side="left")
+            out = items[np.clip(idx, 0, len(items) - 1)]
+            out = np.where(qs <= 0, self.min, np.where(qs >= 1, self.max, out))
+        return float(out[0]) if np.ndim(q) == 0 else out
+
+
+class HyperLogLog:
+    """
+    HyperLogLog distinct-count sketch: feed values chunk by chunk, merge, count
+
+    Uses 2**p one-byte registers (p=12 -> 4 KiB) and has a relative standard
+    error of about 1.04 / sqrt(2**p) (p=12 -> ~1.6%). Sketches built with
+    the same p can be merged (e.g. one per worker or partition).
+    """
+
+    def __init__(self, p: int = 12):
+        if not 4 <= p <= 18:
+            raise ValueError(f"p must be between 4 and 18, got {p}")
+        self.p = p
+        self.registers = np.zeros(1 << p, dtype=np.uint8)
+
+    def update(self, values) -> HyperLogLog:
+        """
+        Add values (NaN/NA are ignored)
+
+        Args:
+            values: Array-like of hashable values
+
+        Returns:
+            self
+        """
+        s = pd.Series(values)
+        s = s[s.notna().to_numpy()]
+        if len(s) == 0:
+            return self
+        h = pd.util.hash_pandas_object(s, index=False, categorize=False).to_numpy()
+        idx = (h >> np.uint64(64 - self.p)).astype(np.intp)
+        rest = h & np.uint64((1 << (64 - self.p)) - 1)
+        # rank = position of the leftmost 1-bit in the remaining 64-p bits
+        hi, lo = (rest >> np.uint64(32)).astype(np.float64), (rest & np.uint64(0xFFFFFFFF)).astype(np.float64)
+        bit_length = np.where(hi > 0, 32 + np.frexp(hi)[1], np.frexp(lo)[1])
+        rank = (64 - self.p - bit_length + 1).astype(np.uint8)
+        np.maximum.at(self.registers, idx, rank)
+        return self
+
+    def merge(self, other: HyperLogLog) -> HyperLogLog:
+        """
+        Fold another sketch into this one
+
+        Args:
+            other: Sketch built with the same p
+
+        Returns:
+            self
+        """
+        if other.p != self.p:
+            raise ValueError(f"Cannot merge sketches with p={self.p} and p={other.p}")
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    def count(self) -> float:
+        """
+        Approximate number of distinct values seen
+
+        Returns:
+            Estimated distinct count
+        """
+        m = len(self.registers)
+        estimate = 0.7213 / (1 + 1.079 / m) * m * m / np.sum(np.ldexp(1.0, -self.registers.astype(int)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * np.log(m / zeros)  # linear counting for small cardinalities
+        return float(estimate)
+
+
+def sketch_chunks(chunks: Iterable[pd.DataFrame], col: str, *, k: int = 200) -> QuantileSketch:
+    """
+    Build a quantile sketch for one column of a chunk stream (e.g. iter_orders_csv)
+
+    Args:
+        chunks: DataFrames containing col
+        col: Column to sketch
+        k: Sketch size
+
+    Returns:
+        QuantileSketch
+    """
+    sketch = QuantileSketch(k)
+    for chunk in chunks:
+        sketch.update(chunk[col])
+    return sketch
+
+
+def sketch_parquet(path: str | Path, col: str, *, k: int = 200, batch_size: int = 65_536) -> QuantileSketch:
+    """
+    Build a quantile sketch for one parquet column, decoding it batch by batch
+
+    Args:
+        path: Parquet file
+        col: Column to sketch
+        k: Sketch size
+        batch_size: Rows per decoded batch
+
+    Returns:
+        QuantileSketch
+    """
+    sketch = QuantileSketch(k)
+    for batch in pq.ParquetFile(path).iter_batches(batch_size=batch_size, columns=[col]):
+        sketch.update(batch.column(0).to_numpy(zero_copy_only=False))
+    return sketch
+
+
+def sketch_iqr_bounds(sketch: QuantileSketch, k: float = 1.5) -> tuple[float, float]:
+    """
+    Approximate IQR-based outlier bounds (same as transforms.iqr_bounds)
+
+    Args:
+        sketch: QuantileSketch of the column
+        k: IQR multiplier (default 1.5)
+
+    Returns:
+        Tuple of (lower_bound, upper_bound)
+    """
+    q1, q3 = sketch.quantile([0.25, 0.75])
+    iqr = q3 - q1
+    return float(q1 - k * iqr), float(q3 + k * iqr)
+
+
+def sketch_winsor_bounds(sketch: QuantileSketch, lo: float = 0.01, hi: float = 0.99) -> tuple[float, float]:
+    """
+    Approximate percentile bounds for winsorizing (clip with Series.clip)
+
+    Args:
+        sketch: QuantileSketch of the column
+        lo: Lower percentile (default 0.01)
+        hi: Upper percentile (default 0.99)
+
+    Returns:
+        Tuple of (lower_bound, upper_bound)
+    """
+    a, b = sketch.quantile([lo, hi])
+    return float(a), float(b)
+
+
+def sketch_outlier_bounds(
+    sketches: dict[str, QuantileSketch],
+    *,
+    k: float = 1.5,
+    lo: float = 0.01,
+    hi: float = 0.99,
+) -> pd.DataFrame:
+    """
+    Approximate outlier bounds for many columns (same layout as transforms.outlier_bounds)
+    
+    Args:
+        sketches: Column name -> QuantileSketch of that column
+        k: IQR multiplier (default 1.5)
+        lo: Lower winsorizing percentile (default 0.01)
+        hi: Upper winsorizing percentile (default 0.99)
+        
+    Returns:
+        DataFrame indexed by column with q1, q3, iqr_lo, iqr_hi,
+        winsor_lo, winsor_hi (usable with transforms.apply_outlier_bounds)
+    """
+    rows = {}
+    for col, sketch in sketches.items():
+        q1, q3, wlo, whi = sketch.quantile([0.25, 0.75, lo, hi])
+        iqr = q3 - q1
+        rows[col] = {
+            "q1": q1,
+            "q3": q3,
+            "iqr_lo": q1 - k * iqr,
+            "iqr_hi": q3 + k * iqr,
+            "winsor_lo": wlo,
+            "winsor_hi": whi,
+        }
+    return pd.DataFrame.from_dict(rows, orient="index")
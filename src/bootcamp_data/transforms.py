@@ -2,8 +2,13 @@
 Data transformation and cleaning functions
 """
 
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+from pandas.api.types import union_categoricals
 import re
+from collections.abc import Iterable
 from datetime import datetime
 
 # Regex pattern for multiple whitespace
@@ -77,17 +82,35 @@ def clean_orders(df: pd.DataFrame) -> pd.DataFrame:
     """
     Complete cleaning pipeline for orders data
     
+    Same result as enforce_schema -> clean_amount -> standardize_status ->
+    remove_duplicates, fused: each coerced column is built once, status is
+    lowercased/stripped once per distinct value instead of per row, and the
+    only full-frame copy is the final deduplicated selection (duplicate
+    detection is then the largest temporary).
+    
     Args:
         df: Raw orders DataFrame
         
     Returns:
         Cleaned DataFrame
     """
-    df = enforce_schema(df)
-    df = clean_amount(df)
-    df = standardize_status(df)
-    df = remove_duplicates(df)
-    return df
+    amount = pd.to_numeric(df["amount"], errors="coerce").to_numpy(dtype="float64", copy=True)
+    amount[amount < 0] = np.nan
+
+    cols = dict(df.items())
+    cols["order_id"] = df["order_id"].astype("string")
+    cols["user_id"] = df["user_id"].astype("string")
+    cols["amount"] = pd.Series(amount, index=df.index, name="amount")
+    cols["quantity"] = pd.to_numeric(df["quantity"], errors="coerce").astype("Int64")
+    if "status" in df.columns:
+        codes, uniques = _factorize(df["status"])
+        norm = pd.Series(uniques, dtype=object).str.lower().str.strip().to_numpy()
+        # code -1 (NA) takes the appended NaN, as .str methods return for NA
+        cols["status"] = pd.Series(np.append(norm, np.nan).take(codes), index=df.index, name="status")
+    out = pd.DataFrame(cols, copy=False)
+
+    dup = out.duplicated()
+    return out[~dup.to_numpy()] if dup.any() else out
 
 
 def missingness_report(df: pd.DataFrame) -> pd.DataFrame:
@@ -126,42 +149,119 @@ def add_missing_flags(df: pd.DataFrame, cols: list[str]) -> pd.DataFrame:
     return out
 
 
-def normalize_text(s: pd.Series) -> pd.Series:
+def _normalize_values(s: pd.Series, engine: str = "pandas") -> pd.Series:
+    if engine == "pyarrow":
+        # Arrow kernels: lowercase stands in for casefold, \s matches ASCII whitespace
+        arr = pa.array(s.astype("string"), type=pa.string(), from_pandas=True)
+        arr = pc.utf8_trim_whitespace(arr)
+        arr = pc.utf8_lower(arr)
+        arr = pc.replace_substring_regex(arr, pattern=r"\s+", replacement=" ")
+        return pd.Series(arr.to_pandas(types_mapper=pd.ArrowDtype), index=s.index, name=s.name)
+    return (
+        s.astype("string")
+        .str.strip()
+        .str.casefold()
+        .str.replace(_ws, " ", regex=True)
+    )
+
+
+def _factorize(s: pd.Series) -> tuple[np.ndarray, pd.Index]:
+    """Integer codes (-1 for NA) and unique values, reusing categorical codes."""
+    if isinstance(s.dtype, pd.CategoricalDtype):
+        return s.cat.codes.to_numpy(), s.cat.categories
+    codes, uniques = pd.factorize(s)
+    return codes, pd.Index(uniques)
+
+
+def _categorical_from_uniques(codes: np.ndarray, values, s: pd.Series) -> pd.Series:
+    """Categorical with codes[i] -> values[codes[i]]; equal values share a category."""
+    new_codes, categories = pd.factorize(np.asarray(values, dtype=object))
+    codes = np.where(codes < 0, -1, new_codes.take(codes, mode="clip") if len(new_codes) else -1)
+    return pd.Series(pd.Categorical.from_codes(codes, categories), index=s.index, name=s.name)
+
+
+def normalize_text(
+    s: pd.Series,
+    *,
+    categorical: bool = False,
+    engine: str = "pandas",
+) -> pd.Series:
     """
     Normalize text: strip, lowercase, collapse whitespace
     
+    With categorical=True only the unique values are normalized (factorize ->
+    normalize uniques -> take), which is much faster on low-cardinality
+    columns such as status.
+    
     Args:
         s: Series to normalize
+        categorical: Return a Categorical built from normalized uniques
+        engine: "pandas" (str methods) or "pyarrow" (Arrow compute kernels;
+            lowercases instead of casefolding)
         
     Returns:
         Normalized series (Paid/PAID/paid → paid)
     """
-    return (
-        s.astype("string")
-        .str.strip()
-        .str.casefold()
-        .str.replace(_ws, " ", regex=True)
-    )
-
-
-def apply_mapping(s: pd.Series, mapping: dict[str, str]) -> pd.Series:
+    if not categorical:
+        return _normalize_values(s, engine)
+    codes, uniques = _factorize(s)
+    norm = _normalize_values(pd.Series(uniques, dtype="string"), engine)
+    return _categorical_from_uniques(codes, norm.to_numpy(dtype=object), s)
+
+
+def apply_mapping(
+    s: pd.Series,
+    mapping: dict[str, str],
+    *,
+    categorical: bool = False,
+) -> pd.Series:
     """
     Apply dictionary mapping to series values
     
+    The series is factorized once and only its unique values are looked up,
+    so the cost scales with cardinality rather than row count.
+    
     Args:
         s: Series to map
         mapping: Dictionary of value replacements
+        categorical: Return a Categorical (always the case for categorical input)
         
     Returns:
-        Series with mapped values (unmapped values stay unchanged)
+        Series with mapped values (unmapped values stay unchanged), its dtype
+        inferred from the values (e.g. float64 in, float64 out)
     """
-    return s.map(lambda x: mapping.get(x, x))
+    codes, uniques = _factorize(s)
+    mapped = np.array([mapping.get(u, u) for u in uniques], dtype=object)
+    if categorical or isinstance(s.dtype, pd.CategoricalDtype):
+        return _categorical_from_uniques(codes, mapped, s)
+
+    na = codes < 0
+    values = mapped.take(codes, mode="clip") if len(mapped) else np.empty(len(s), dtype=object)
+    if na.any():
+        values[na] = s[na].to_numpy(dtype=object)
+    # Let pandas infer the dtype as Series.map does (float64 stays float64)
+    return pd.Series(values, index=s.index, name=s.name, dtype=object).infer_objects()
+
+
+def _ts_rank(ts: pd.Series) -> np.ndarray:
+    """Order-preserving numeric key for a timestamp column; missing values rank lowest."""
+    if pd.api.types.is_datetime64_any_dtype(ts.dtype):
+        return pd.DatetimeIndex(ts).asi8  # NaT -> min int64
+    if pd.api.types.is_numeric_dtype(ts.dtype):
+        return np.nan_to_num(ts.to_numpy(dtype="float64", na_value=np.nan), nan=-np.inf)
+    # e.g. ISO-8601 strings: rank by sorted unique values, NA -> -1
+    codes, _ = pd.factorize(ts, sort=True)
+    return codes
 
 
 def dedupe_keep_latest(df: pd.DataFrame, key_cols: list[str], ts_col: str) -> pd.DataFrame:
     """
     Deduplicate by keeping latest record based on timestamp
     
+    Hash-grouped "argmax per key" instead of a full sort, so the cost is
+    linear in rows. Missing timestamps rank oldest (any dated record wins);
+    ties go to the row that appears last. Kept rows stay in input order.
+    
     Args:
         df: DataFrame to deduplicate
         key_cols: List of columns that define a unique record
@@ -170,45 +270,197 @@ def dedupe_keep_latest(df: pd.DataFrame, key_cols: list[str], ts_col: str) -> pd
     Returns:
         Deduplicated DataFrame with latest records kept
     """
-    return (
-        df.sort_values(ts_col)
-          .drop_duplicates(subset=key_cols, keep="last")
-          .reset_index(drop=True)
+    if len(df) == 0:
+        return df.reset_index(drop=True)
+    keys = df.groupby(key_cols, sort=False, dropna=False, observed=True).ngroup().to_numpy()
+    n_keys = keys.max() + 1
+    rank = _ts_rank(df[ts_col])
+
+    # Latest timestamp per key, then the last row holding it
+    best = np.full(n_keys, rank.min())
+    np.maximum.at(best, keys, rank)
+    cand = np.flatnonzero(rank == best[keys])
+    last = np.full(n_keys, -1)
+    np.maximum.at(last, keys[cand], cand)
+    return df.take(np.sort(last)).reset_index(drop=True)
+
+
+def dedupe_keep_latest_chunks(
+    chunks: Iterable[pd.DataFrame],
+    key_cols: list[str],
+    ts_col: str,
+) -> pd.DataFrame:
+    """
+    dedupe_keep_latest over a stream of chunks (e.g. iter_orders_csv)
+    
+    Only the current latest record per key is carried between chunks, so
+    memory is bounded by the number of distinct keys, not rows. Categorical
+    columns stay categorical even when chunks have different categories.
+    
+    Args:
+        chunks: DataFrames with the same columns, in file order
+        key_cols: List of columns that define a unique record
+        ts_col: Timestamp column to sort by
+        
+    Returns:
+        Deduplicated DataFrame with latest records kept
+    """
+    latest = None
+    for chunk in chunks:
+        frame = chunk if latest is None else _concat_keep_categories([latest, chunk])
+        latest = dedupe_keep_latest(frame, key_cols, ts_col)
+    return latest if latest is not None else pd.DataFrame()
+
+
+def _concat_keep_categories(frames: list[pd.DataFrame]) -> pd.DataFrame:
+    """pd.concat that keeps categorical columns categorical (union of the categories)."""
+    frames = list(frames)
+    for col in frames[0].columns:
+        if any(isinstance(f[col].dtype, pd.CategoricalDtype) for f in frames):
+            parts = [f[col].astype("category") for f in frames]
+            dtype = pd.CategoricalDtype(union_categoricals(parts, ignore_order=True).categories)
+            frames = [f.assign(**{col: f[col].astype(dtype)}) for f in frames]
+    return pd.concat(frames, ignore_index=True)
+
+
+def merge_keep_latest(
+    prior: pd.DataFrame | None,
+    delta: pd.DataFrame,
+    key_cols: list[str],
+    ts_col: str,
+) -> pd.DataFrame:
+    """
+    Merge new records into a previous output, keeping the latest record per key
+    
+    Invariant: when prior is None (initial build) or itself a result of this
+    function, the result holds the same rows as dedupe_keep_latest over all
+    records received so far (prior's sources followed by delta); only the
+    row order differs. Only keys present in delta are re-deduplicated;
+    prior rows for untouched keys are kept as they are. Categorical columns
+    stay categorical, with the union of prior's and delta's categories.
+    
+    Args:
+        prior: Previously built DataFrame, or None for the initial build
+        delta: New records with the same columns
+        key_cols: List of columns that define a unique record
+        ts_col: Timestamp column to sort by
+        
+    Returns:
+        Merged DataFrame
+    """
+    if prior is None:
+        return dedupe_keep_latest(delta, key_cols, ts_col)
+    touched = pd.MultiIndex.from_frame(prior[key_cols]).isin(
+        pd.MultiIndex.from_frame(delta[key_cols])
     )
+    latest = dedupe_keep_latest(
+        _concat_keep_categories([prior[touched], delta]), key_cols, ts_col
+    )
+    return _concat_keep_categories([prior[~touched], latest])
 
 
 # ============================================================================
 # DATETIME HELPERS (Day 3)
 # ============================================================================
 
-def parse_datetime(df: pd.DataFrame, col: str, *, utc: bool = True) -> pd.DataFrame:
+# Fixed ISO-8601 layouts tried by parse_datetime, most specific first
+_ISO_LAYOUTS = [
+    (re.compile(r"\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}(Z|[+-]\d{2}:?\d{2})"), "%Y-%m-%dT%H:%M:%S%z"),
+    (re.compile(r"\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}"), "%Y-%m-%dT%H:%M:%S"),
+    (re.compile(r"\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}"), "%Y-%m-%d %H:%M:%S"),
+    (re.compile(r"\d{4}-\d{2}-\d{2}"), "%Y-%m-%d"),
+]
+
+
+def infer_datetime_format(s: pd.Series, sample_size: int = 1000) -> str | None:
+    """
+    Detect the fixed ISO-8601 layout used by most of a sample of strings
+    
+    Args:
+        s: String series
+        sample_size: Number of non-null values to check
+        
+    Returns:
+        strftime format matched by at least half the sample, or None
+    """
+    sample = s.iloc[: sample_size * 4].dropna().head(sample_size).astype(str)
+    best, best_hits = None, 0
+    for pattern, fmt in _ISO_LAYOUTS:
+        hits = sum(1 for v in sample if pattern.fullmatch(v))
+        if hits > best_hits:
+            best, best_hits = fmt, hits
+    return best if best_hits * 2 >= len(sample) > 0 else None
+
+
+def parse_datetime(
+    df: pd.DataFrame,
+    col: str,
+    *,
+    utc: bool = True,
+    format: str | None = None,
+) -> pd.DataFrame:
     """
     Parse string column to datetime
     
+    The layout is detected from a sample (or given as format) and used as an
+    explicit format; rows that don't match it fall back to per-element
+    parsing instead of silently becoming NaT. Repeated values (e.g.
+    signup_date) are parsed once through pandas' unique-value cache.
+    
     Args:
         df: DataFrame to transform
         col: Column name to parse
         utc: Whether to convert to UTC timezone
+        format: strftime format (detected from a sample when None)
         
     Returns:
         DataFrame with parsed datetime column
     """
-    dt = pd.to_datetime(df[col], errors="coerce", utc=utc)
+    s = df[col]
+    if pd.api.types.is_datetime64_any_dtype(s.dtype):
+        return df.assign(**{col: pd.to_datetime(s, utc=utc)})
+
+    fmt = format or infer_datetime_format(s)
+    if fmt is None:
+        return df.assign(**{col: pd.to_datetime(s, errors="coerce", utc=utc, cache=True)})
+
+    dt = pd.to_datetime(s, format=fmt, errors="coerce", utc=utc, cache=True)
+    bad = dt.isna()
+    if bad.any() and (bad := bad & s.notna()).any():
+        fallback = pd.to_datetime(s[bad], format="mixed", errors="coerce", utc=utc)
+        dt = dt.mask(bad, fallback)
     return df.assign(**{col: dt})
 
 
-def add_time_parts(df: pd.DataFrame, ts_col: str) -> pd.DataFrame:
+def add_time_parts(
+    df: pd.DataFrame,
+    ts_col: str,
+    *,
+    compact: bool = False,
+    labels: tuple[str, ...] = (),
+) -> pd.DataFrame:
     """
     Extract time parts from datetime column (date, year, month, day_of_week, hour)
     
+    compact=True derives all parts in one vectorized pass over the raw
+    timestamps and stores them as small integers (date as Arrow date32,
+    month 1-12, dow 0=Monday); string labels come from time_labels, either
+    later on demand or here via labels.
+    
     Args:
         df: DataFrame to transform
         ts_col: Datetime column name
+        compact: Integer encodings instead of date objects / strings
+        labels: Compact parts to store as categorical labels instead
+            (e.g. ("month", "dow") keeps "2025-03" / "Monday" values)
         
     Returns:
         DataFrame with additional time columns (date, year, month, dow, hour)
     """
     ts = df[ts_col]
+    if compact:
+        parts = pd.DataFrame(_time_codes(ts))
+        return df.assign(**(dict(parts.items()) | {part: time_labels(parts, part) for part in labels}))
     return df.assign(
         date=ts.dt.date,
         year=ts.dt.year,
@@ -218,6 +470,54 @@ def add_time_parts(df: pd.DataFrame, ts_col: str) -> pd.DataFrame:
     )
 
 
+def _time_codes(ts: pd.Series) -> dict[str, pd.Series]:
+    """Compact date/year/month/dow/hour from the int64 wall-clock values of ts."""
+    if ts.dt.tz is not None:
+        ts = ts.dt.tz_localize(None)  # wall clock in the column's own timezone
+    ns = ts.to_numpy(dtype="datetime64[ns]")
+    na = np.isnat(ns)
+    days = ns.astype("datetime64[D]")
+    months = days.astype("datetime64[M]").astype(np.int64)
+    hours = (ns - days).astype("timedelta64[h]").astype(np.int64)
+
+    def part(values, dtype):
+        return pd.Series(pd.arrays.IntegerArray(values.astype(dtype), na), index=ts.index)
+
+    return {
+        # date32 (4 bytes, written as a parquet DATE) like the baseline's ts.dt.date
+        "date": pd.Series(pd.arrays.ArrowExtensionArray(pa.array(days, type=pa.date32())), index=ts.index),
+        "year": part(months // 12 + 1970, np.int16),
+        "month": part(months % 12 + 1, np.int8),
+        "dow": part((days.astype(np.int64) + 3) % 7, np.int8),  # 1970-01-01 was a Thursday
+        "hour": part(hours, np.int8),
+    }
+
+
+_DAY_NAMES = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+
+
+def time_labels(df: pd.DataFrame, part: str) -> pd.Series:
+    """
+    String labels for compact time parts, built from unique codes only
+    
+    Args:
+        df: DataFrame with compact time parts (add_time_parts(..., compact=True))
+        part: "month" ("2025-03", from year + month) or "dow" ("Monday")
+        
+    Returns:
+        Categorical series of labels
+    """
+    if part == "dow":
+        cat = pd.Categorical.from_codes(df["dow"].fillna(-1).astype(np.int8), _DAY_NAMES)
+        return pd.Series(cat, index=df.index, name="dow")
+    if part == "month":
+        key = (df["year"].astype("Int32") * 100 + df["month"]).rename("month")
+        codes, uniques = _factorize(key)
+        labels = [f"{u // 100:04d}-{u % 100:02d}" for u in uniques]
+        return _categorical_from_uniques(codes, labels, key)
+    raise ValueError(f"Unknown time part: {part}")
+
+
 # ============================================================================
 # OUTLIER HELPERS (Day 3)
 # ============================================================================
@@ -270,4 +570,84 @@ def add_outlier_flag(df: pd.DataFrame, col: str, *, k: float = 1.5) -> pd.DataFr
         DataFrame with new {col}__is_outlier boolean column
     """
     lo, hi = iqr_bounds(df[col], k=k)
-    return df.assign(**{f"{col}__is_outlier": (df[col] < lo) | (df[col] > hi)})
\ No newline at end of file
+    return df.assign(**{f"{col}__is_outlier": (df[col] < lo) | (df[col] > hi)})
+
+
+def outlier_bounds(
+    df: pd.DataFrame,
+    cols: list[str],
+    *,
+    k: float = 1.5,
+    lo: float = 0.01,
+    hi: float = 0.99,
+    by: str | None = None,
+) -> pd.DataFrame:
+    """
+    IQR and winsorizing bounds for many columns from one quantile pass
+    
+    Args:
+        df: DataFrame to analyze
+        cols: Numeric columns
+        k: IQR multiplier (default 1.5)
+        lo: Lower winsorizing percentile (default 0.01)
+        hi: Upper winsorizing percentile (default 0.99)
+        by: Optional group column (e.g. "country") for per-group bounds
+        
+    Returns:
+        DataFrame indexed by column (or by (group, column)) with
+        q1, q3, iqr_lo, iqr_hi, winsor_lo, winsor_hi
+    """
+    qs = sorted({0.25, 0.75, lo, hi})
+    data = df[cols].astype("float64")
+    if by is None:
+        q = data.quantile(qs).T
+    else:
+        q = data.groupby(df[by], observed=True).quantile(qs).stack(future_stack=True).unstack(level=1)
+    q.columns = list(q.columns)
+    q1, q3 = q[0.25], q[0.75]
+    iqr = q3 - q1
+    return pd.DataFrame({
+        "q1": q1,
+        "q3": q3,
+        "iqr_lo": q1 - k * iqr,
+        "iqr_hi": q3 + k * iqr,
+        "winsor_lo": q[lo],
+        "winsor_hi": q[hi],
+    })
+
+
+def apply_outlier_bounds(
+    df: pd.DataFrame,
+    bounds: pd.DataFrame,
+    *,
+    by: str | None = None,
+    flag: bool = True,
+    winsor: bool = True,
+) -> pd.DataFrame:
+    """
+    Add outlier flags and winsorized columns from precomputed bounds
+    
+    Args:
+        df: DataFrame to transform
+        bounds: Output of outlier_bounds (same by)
+        by: Group column the bounds were computed by
+        flag: Add {col}__is_outlier (outside the IQR bounds)
+        winsor: Add {col}__winsor (clipped to the winsorizing bounds)
+        
+    Returns:
+        DataFrame with the new columns
+    """
+    cols = bounds.index.unique(level=-1)
+    new = {}
+    for col in cols:
+        if by is None:
+            b = bounds.loc[col]
+        else:
+            # per-row bounds: group -> bounds lookup (NaN for unseen groups)
+            b = bounds.xs(col, level=-1).reindex(df[by]).set_axis(df.index)
+        x = df[col]
+        if flag:
+            new[f"{col}__is_outlier"] = (x < b["iqr_lo"]) | (x > b["iqr_hi"])
+        if winsor:
+            new[f"{col}__winsor"] = x.clip(lower=b["winsor_lo"], upper=b["winsor_hi"])
+    return df.assign(**new)